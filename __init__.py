@@ -6,9 +6,18 @@ Resume Screening Agent - Source Package
 __all__ = [
     'agent',
     'database',
+    'sqlite_database',
+    'outbox',
+    'retention',
     'parsers',
     'utils',
+    'skills',
+    'experience',
+    'rules',
     'vector_store',
+    'pgvector_store',
+    'lexical_index',
+    'reranker',
     'api_integrations'
 ]
 
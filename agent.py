@@ -2,6 +2,8 @@
 Resume Screening Agent using LangChain and multiple AI models
 """
 import os
+import re
+import time
 from typing import List, Dict, Optional
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
@@ -10,22 +12,39 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 # Use relative imports for better compatibility
 try:
-    from .vector_store import VectorStore
-    from .utils import extract_skills, calculate_experience_years, clean_text
+    from .vector_store import create_vector_store
+    from .reranker import CrossEncoderReranker, fit_rerank_calibration
+    from .skills import get_skill_embedding_index
+    from .rules import HardRequirements, extract_resume_features
+    from .utils import clean_text, coerce_score
 except ImportError:
     # Fallback for absolute imports
-    from src.vector_store import VectorStore
-    from src.utils import extract_skills, calculate_experience_years, clean_text
+    from src.vector_store import create_vector_store
+    from src.reranker import CrossEncoderReranker, fit_rerank_calibration
+    from src.skills import get_skill_embedding_index
+    from src.rules import HardRequirements, extract_resume_features
+    from src.utils import clean_text, coerce_score
 
 
 class ResumeScreeningAgent:
     """AI-powered resume screening agent"""
     
-    def __init__(self, model_name: str = "openai"):
-        """Initialize the agent with specified model"""
+    def __init__(self, model_name: str = "openai", rerank_top_k: int = 0,
+                 semantic_skills: bool = True):
+        """Initialize the agent with specified model
+        
+        rerank_top_k > 0 enables a local cross-encoder rerank of the top K
+        resumes by vector similarity before any LLM call is made. The rest
+        of the batch gets a score calibrated from the reranked top K.
+        semantic_skills adds skills inferred from embeddings to the exact
+        taxonomy matches.
+        """
         self.model_name = model_name.lower()
         self.llm = self._initialize_model()
-        self.vector_store = VectorStore()
+        self.vector_store = create_vector_store()
+        self.rerank_top_k = rerank_top_k
+        self.reranker = CrossEncoderReranker() if rerank_top_k > 0 else None
+        self.semantic_skills = semantic_skills
     
     def _initialize_model(self):
         """Initialize the LLM based on model name"""
@@ -92,18 +111,40 @@ Be thorough and objective in your evaluation."""
         return prompt
     
     def screen_resume(self, job_description: str, resume_text: str, 
-                     resume_metadata: Dict = None) -> Dict:
-        """Screen a single resume against job description"""
-        # Clean texts
+                     resume_metadata: Dict = None,
+                     job_embedding: Optional[List[float]] = None,
+                     vector_similarity: Optional[float] = None,
+                     rerank_score: Optional[float] = None,
+                     resume_features: Optional[Dict] = None) -> Dict:
+        """Screen a single resume against job description
+        
+        job_embedding is an optional precomputed embedding of the cleaned job
+        description, used to avoid embedding it again for every resume.
+        vector_similarity, rerank_score and resume_features (skills and
+        experience from extract_resume_features) may be passed in when they
+        were already computed for a batch of resumes. rerank_score is a
+        calibrated 0-1 cross-encoder score; when given it is averaged with
+        the vector score to form the retrieval part of the final score.
+        """
+        # Clean texts; skills and employment dates are read from the raw
+        # text, since cleaning drops line breaks and characters like "/"
+        raw_resume_text = resume_text
         job_description = clean_text(job_description)
         resume_text = clean_text(resume_text)
         
         # Calculate vector similarity
-        vector_similarity = self.vector_store.calculate_similarity(
-            job_description, resume_text
-        )
+        if vector_similarity is None:
+            vector_similarity = self.vector_store.calculate_similarity(
+                job_description, resume_text, embedding1=job_embedding
+            )
         vector_score = vector_similarity * 100
         
+        # Retrieval score: cosine similarity, blended with the cross-encoder
+        # score (measured or calibrated) when reranking is enabled
+        retrieval_score = vector_score
+        if rerank_score is not None:
+            retrieval_score = (vector_score + rerank_score * 100) / 2
+        
         # Get AI analysis
         prompt = self._create_screening_prompt(job_description, resume_text)
         
@@ -147,17 +188,33 @@ Be thorough and objective in your evaluation."""
             }
         
         # Extract additional information
-        matched_skills = extract_skills(resume_text)
-        experience_years = calculate_experience_years(resume_text)
+        if resume_features is None:
+            resume_features = extract_resume_features([raw_resume_text])[0]
+        matched_skills = list(resume_features["skills"])
+        experience_years = resume_features["experience_years"]
+        skill_confidence = {skill: 1.0 for skill in matched_skills}
+        if self.semantic_skills:
+            # Reuses the vector store's already loaded embedding model
+            skill_index = get_skill_embedding_index(self.vector_store.embedding_model)
+            for inferred in skill_index.infer(raw_resume_text):
+                if inferred["skill"] not in skill_confidence:
+                    matched_skills.append(inferred["skill"])
+                    skill_confidence[inferred["skill"]] = inferred["confidence"]
+        
+        # LLMs sometimes answer "85/100" or "N/A" instead of a number
+        ai_score = coerce_score(ai_analysis.get("overall_score"))
+        if ai_score is None:
+            ai_score = vector_score
         
-        # Combine scores (weighted average: 70% AI, 30% vector similarity)
-        final_score = (ai_analysis.get("overall_score", vector_score) * 0.7) + (vector_score * 0.3)
+        # Combine scores (weighted average: 70% AI, 30% retrieval score)
+        final_score = (ai_score * 0.7) + (retrieval_score * 0.3)
         
         # Build result
         result = {
             "score": round(final_score, 2),
             "vector_similarity": round(vector_similarity, 3),
-            "ai_score": ai_analysis.get("overall_score", vector_score),
+            "rerank_score": round(rerank_score, 3) if rerank_score is not None else None,
+            "ai_score": ai_score,
             "strengths": ai_analysis.get("strengths", []),
             "weaknesses": ai_analysis.get("weaknesses", []),
             "matched_requirements": ai_analysis.get("matched_requirements", []),
@@ -165,6 +222,7 @@ Be thorough and objective in your evaluation."""
             "recommendation": ai_analysis.get("recommendation", "MAYBE"),
             "reasoning": ai_analysis.get("reasoning", ""),
             "matched_skills": matched_skills,
+            "skill_confidence": skill_confidence,
             "experience_years": experience_years,
             "model_used": self.model_name,
             "metadata": resume_metadata or {}
@@ -172,30 +230,141 @@ Be thorough and objective in your evaluation."""
         
         return result
     
-    def screen_multiple_resumes(self, job_description: str, resumes: List[Dict]) -> List[Dict]:
-        """Screen multiple resumes and rank them"""
+    def _search_metadata(self, resume_features: Dict, resume_metadata: Dict, job_id: str) -> Dict:
+        """Build filterable vector store metadata for a resume
+        
+        Job membership is a job_<id> flag per job, so a resume screened for
+        several jobs matches a filter on each of them, e.g.
+        {"job_<id>": True}. The vector store keeps the first uploaded_at.
+        """
+        metadata = dict(resume_metadata)
+        metadata["job_" + job_id] = True
+        metadata["uploaded_at"] = time.time()
+        metadata["experience_years"] = resume_features["experience_years"]
+        for skill in resume_features["skills"]:
+            metadata["skill_" + re.sub(r'[^a-z0-9]+', '_', skill.lower()).strip('_')] = True
+        return metadata
+    
+    def _prefilter_rejection(self, resume_features: Dict, outcome: Dict,
+                             resume_metadata: Dict) -> Dict:
+        """Build the result for a resume rejected by the hard requirements"""
+        return {
+            "score": 0.0,
+            "vector_similarity": None,
+            "rerank_score": None,
+            "ai_score": None,
+            "strengths": [],
+            "weaknesses": outcome["reasons"],
+            "matched_requirements": [],
+            "missing_requirements": outcome["reasons"],
+            "recommendation": "REJECT",
+            "reasoning": "Failed hard requirements: " + "; ".join(outcome["reasons"]),
+            "matched_skills": list(resume_features["skills"]),
+            "skill_confidence": {skill: 1.0 for skill in resume_features["skills"]},
+            "experience_years": resume_features["experience_years"],
+            "model_used": self.model_name,
+            "metadata": resume_metadata or {},
+            "prefilter": outcome
+        }
+    
+    def screen_multiple_resumes(self, job_description: str, resumes: List[Dict],
+                                requirements: Optional[HardRequirements] = None) -> List[Dict]:
+        """Screen multiple resumes and rank them
+        
+        requirements are the job's hard knock-out criteria. They are checked
+        for the whole batch before any embedding or LLM work; rejected resumes
+        score 0 and flagged ones are screened with the reasons attached.
+        """
         results = []
         
-        # Add job description to vector store
+        # Stage 0: features and hard requirements, evaluated for the batch at once
+        texts = [resume_data.get("text", "") for resume_data in resumes]
+        resume_features = extract_resume_features(texts)
+        outcomes = [None] * len(resumes)
+        if requirements is not None and not requirements.is_empty():
+            outcomes = requirements.evaluate(resume_features, texts)
+        
+        candidates = []
+        for i, resume_data in enumerate(resumes):
+            outcome = outcomes[i]
+            if outcome is not None and outcome["action"] == "reject":
+                resume_metadata = resume_data.get("metadata", {})
+                result = self._prefilter_rejection(resume_features[i], outcome, resume_metadata)
+                result["resume_id"] = None
+                result["resume_index"] = i
+                result["filename"] = resume_metadata.get("filename", "unknown")
+                results.append(result)
+            else:
+                candidates.append(i)
+        
+        if not candidates:
+            return self._rank(results)
+        
+        # Add job description to vector store; a known job description
+        # reuses its stored embedding instead of being embedded again
         job_id = self.vector_store.add_job_description(
-            job_description,
+            clean_text(job_description),
             {"timestamp": str(os.path.getmtime(__file__) if os.path.exists(__file__) else 0)}
         )
+        job_embedding = self.vector_store.get_job_embedding(job_id)
+        
+        # Stage 1: vector similarity for the whole batch in one encode call
+        cleaned_job = clean_text(job_description)
+        cleaned_texts = {i: clean_text(resumes[i].get("text", "")) for i in candidates}
+        similarities = dict(zip(candidates, self.vector_store.calculate_similarities(
+            cleaned_job, [cleaned_texts[i] for i in candidates], embedding1=job_embedding
+        )))
         
-        for resume_data in resumes:
+        # Stage 2: cross-encoder rerank of the top of the vector shortlist.
+        # The rest of the batch gets a score calibrated on the shortlist, so
+        # every resume's final score blends the same two signals
+        rerank_scores = {}
+        if self.reranker:
+            shortlist = sorted(candidates, key=lambda i: similarities[i], reverse=True)
+            shortlist = shortlist[:self.rerank_top_k]
+            scores = self.reranker.score(cleaned_job, [cleaned_texts[i] for i in shortlist])
+            rerank_scores = dict(zip(shortlist, scores))
+            estimate = fit_rerank_calibration([similarities[i] for i in shortlist], scores)
+            for i in candidates:
+                if i not in rerank_scores:
+                    rerank_scores[i] = estimate(similarities[i])
+        
+        # Stage 3: LLM screening, best retrieval candidates first
+        order = sorted(
+            candidates,
+            key=lambda i: (rerank_scores.get(i, 0.0), similarities[i]),
+            reverse=True
+        )
+        for i in order:
+            resume_data = resumes[i]
             resume_text = resume_data.get("text", "")
             resume_metadata = resume_data.get("metadata", {})
             
             # Add resume to vector store
-            resume_id = self.vector_store.add_resume(resume_text, resume_metadata)
+            resume_id = self.vector_store.add_resume(
+                resume_text,
+                self._search_metadata(resume_features[i], resume_metadata, job_id)
+            )
             
             # Screen resume
-            result = self.screen_resume(job_description, resume_text, resume_metadata)
+            result = self.screen_resume(
+                job_description, resume_text, resume_metadata,
+                job_embedding=job_embedding,
+                vector_similarity=similarities[i],
+                rerank_score=rerank_scores.get(i),
+                resume_features=resume_features[i]
+            )
             result["resume_id"] = resume_id
+            result["resume_index"] = i
             result["filename"] = resume_metadata.get("filename", "unknown")
+            result["prefilter"] = outcomes[i]
             
             results.append(result)
         
+        return self._rank(results)
+    
+    def _rank(self, results: List[Dict]) -> List[Dict]:
+        """Sort results by score and assign ranks"""
         # Sort by score (descending)
         results.sort(key=lambda x: x["score"], reverse=True)
         
@@ -55,6 +55,7 @@ if not src_found:
 from dotenv import load_dotenv
 import pandas as pd
 from typing import List, Dict
+import io
 import json
 from datetime import datetime
 
@@ -128,17 +129,21 @@ if src_dir and src_dir.exists() and src_dir != current_dir:
 try:
     if use_src_prefix:
         from src.agent import ResumeScreeningAgent
-        from src.parsers import parse_resume, extract_resume_sections
-        from src.database import Database
+        from src.parsers import parse_resume_document, iter_zip_resumes, segment_resume
+        from src.rules import HardRequirements
+        from src.database import Database, get_database, get_connection_health
+        from src.outbox import get_outbox
         from src.api_integrations import GoogleCalendarIntegration, NotionIntegration, GoogleSheetsIntegration
-        from src.utils import export_to_json
+        from src.utils import export_to_json, iter_csv, iter_jsonl, export_to_parquet
     else:
         # Files are in same directory - import directly
         from agent import ResumeScreeningAgent
-        from parsers import parse_resume, extract_resume_sections
-        from database import Database
+        from parsers import parse_resume_document, iter_zip_resumes, segment_resume
+        from rules import HardRequirements
+        from database import Database, get_database, get_connection_health
+        from outbox import get_outbox
         from api_integrations import GoogleCalendarIntegration, NotionIntegration, GoogleSheetsIntegration
-        from utils import export_to_json
+        from utils import export_to_json, iter_csv, iter_jsonl, export_to_parquet
 except ImportError:
     # Fallback: Load modules directly using importlib
     if not src_dir or not src_dir.exists():
@@ -190,26 +195,39 @@ except ImportError:
     
     try:
         # Load in dependency order
+        load_module('lexical_index', 'lexical_index.py')
         load_module('vector_store', 'vector_store.py')
+        load_module('reranker', 'reranker.py')
+        load_module('skills', 'skills.py')
+        load_module('experience', 'experience.py')
         load_module('utils', 'utils.py')
+        load_module('pgvector_store', 'pgvector_store.py')
         load_module('parsers', 'parsers.py')
+        load_module('rules', 'rules.py')
+        load_module('sqlite_database', 'sqlite_database.py')
         load_module('database', 'database.py')
+        load_module('outbox', 'outbox.py')
+        load_module('retention', 'retention.py')
         load_module('api_integrations', 'api_integrations.py')
         load_module('agent', 'agent.py')
         
         # Now import should work
         if use_src_prefix:
             from src.agent import ResumeScreeningAgent
-            from src.parsers import parse_resume, extract_resume_sections
-            from src.database import Database
+            from src.parsers import parse_resume_document, iter_zip_resumes, segment_resume
+            from src.rules import HardRequirements
+            from src.database import Database, get_database, get_connection_health
+            from src.outbox import get_outbox
             from src.api_integrations import GoogleCalendarIntegration, NotionIntegration, GoogleSheetsIntegration
-            from src.utils import export_to_json
+            from src.utils import export_to_json, iter_csv, iter_jsonl, export_to_parquet
         else:
             from agent import ResumeScreeningAgent
-            from parsers import parse_resume, extract_resume_sections
-            from database import Database
+            from parsers import parse_resume_document, iter_zip_resumes, segment_resume
+            from rules import HardRequirements
+            from database import Database, get_database, get_connection_health
+            from outbox import get_outbox
             from api_integrations import GoogleCalendarIntegration, NotionIntegration, GoogleSheetsIntegration
-            from utils import export_to_json
+            from utils import export_to_json, iter_csv, iter_jsonl, export_to_parquet
     except Exception as e:
         st.error("❌ Failed to load modules.")
         st.error(f"**Error:** {str(e)}")
@@ -319,17 +337,33 @@ def main():
         }
         selected_model = model_map[model_option]
         
+        rerank_top_k = st.slider(
+            "Cross-encoder rerank (top K)",
+            min_value=0,
+            max_value=50,
+            value=0,
+            help="Rerank the top K resumes by vector similarity with a local cross-encoder before AI analysis; "
+                 "the other resumes get a score calibrated on the top K (0 = off)"
+        )
+        
         st.divider()
         
-        # Database status
-        db = Database()
+        # Database status; the client is shared by the whole process and
+        # its health is cached, so reruns do not hit the database
+        db = get_database()
         if db.is_connected():
-            # Test connection to show detailed status
-            connection_test = db.test_connection()
+            connection_test = get_connection_health(db).status()
             if connection_test["connected"]:
-                st.success("✅ Supabase Connected")
+                st.success("✅ Local SQLite Database" if db.backend == "sqlite" else "✅ Supabase Connected")
                 if connection_test["tables_exist"]:
                     st.caption("Database ready")
+                    outbox = get_outbox(db)
+                    pending = outbox.pending_count()
+                    if pending:
+                        st.caption(f"⏳ {pending} screening runs waiting to be saved")
+                    dead = outbox.dead_letter_count()
+                    if dead:
+                        st.warning(f"⚠️ {dead} screening runs could not be saved; see last_error in the outbox")
                 else:
                     st.warning("⚠️ Tables not created")
                     if st.button("Show Setup SQL", key="show_sql_sidebar"):
@@ -342,7 +376,7 @@ def main():
             st.caption("Database features will be disabled")
             if st.button("Test Connection", key="test_conn_sidebar"):
                 with st.spinner("Testing..."):
-                    test_result = db.test_connection()
+                    test_result = get_connection_health(db).refresh()
                     if test_result["connected"]:
                         st.success(test_result["message"])
                     else:
@@ -372,10 +406,10 @@ def main():
             st.info("ℹ️ Google Sheets (Optional)")
     
     # Main content tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["📝 Screen Resumes", "📊 Results", "📈 History", "⚙️ Settings"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📝 Screen Resumes", "📊 Results", "📈 History", "🔎 Talent Pool", "⚙️ Settings"])
     
     with tab1:
-        screen_resumes_tab(selected_model, db)
+        screen_resumes_tab(selected_model, db, rerank_top_k)
     
     with tab2:
         results_tab()
@@ -384,10 +418,13 @@ def main():
         history_tab(db)
     
     with tab4:
+        talent_pool_tab(db)
+    
+    with tab5:
         settings_tab()
 
 
-def screen_resumes_tab(model_name: str, db: Database):
+def screen_resumes_tab(model_name: str, db: Database, rerank_top_k: int = 0):
     """Screen resumes tab"""
     st.header("Screen Resumes")
     
@@ -421,35 +458,47 @@ def screen_resumes_tab(model_name: str, db: Database):
     # Resume upload
     st.subheader("Upload Resumes")
     uploaded_files = st.file_uploader(
-        "Upload resume files (PDF or DOCX)",
-        type=['pdf', 'docx', 'doc'],
+        "Upload resume files (PDF or DOCX) or ZIP archives of them",
+        type=['pdf', 'docx', 'doc', 'zip'],
         accept_multiple_files=True,
-        help="Upload one or multiple resume files"
+        help="Upload one or multiple resume files, or a ZIP export of applicant resumes"
     )
     
     if uploaded_files:
         st.session_state.resumes = []
         for uploaded_file in uploaded_files:
+            if uploaded_file.name.lower().endswith('.zip'):
+                add_resume_archive(uploaded_file)
+                continue
+            
             try:
                 file_content = uploaded_file.read()
-                resume_text = parse_resume(file_content, uploaded_file.name)
-                resume_sections = extract_resume_sections(resume_text)
-                
-                st.session_state.resumes.append({
-                    "text": resume_text,
-                    "metadata": {
-                        "filename": uploaded_file.name,
-                        "name": resume_sections.get("name", ""),
-                        "email": resume_sections.get("email", ""),
-                        "phone": resume_sections.get("phone", ""),
-                        "sections": resume_sections
-                    }
-                })
-                
-                st.success(f"✅ {uploaded_file.name} parsed successfully")
+                document = parse_resume_document(file_content, uploaded_file.name)
+                add_parsed_resume(uploaded_file.name, document)
             except Exception as e:
                 st.error(f"❌ Error parsing {uploaded_file.name}: {str(e)}")
     
+    # Hard requirements, checked before any embedding or LLM call
+    with st.expander("Hard Requirements (optional)"):
+        req_col1, req_col2 = st.columns(2)
+        with req_col1:
+            min_years = st.number_input("Minimum years of experience", min_value=0.0, max_value=50.0, value=0.0, step=0.5)
+            min_degree = st.selectbox("Minimum degree", ["None", "Bachelor", "Master", "PhD"])
+        with req_col2:
+            mandatory_skills = st.text_input("Mandatory skills", placeholder="e.g. Python, Kubernetes")
+            requirement_action = st.radio(
+                "Resumes that do not qualify",
+                ["reject", "flag"],
+                format_func=lambda action: "Reject without screening" if action == "reject" else "Screen and flag",
+                horizontal=True
+            )
+    requirements = HardRequirements(
+        min_years=min_years or None,
+        mandatory_skills=[skill.strip() for skill in mandatory_skills.split(",") if skill.strip()],
+        min_degree=None if min_degree == "None" else min_degree,
+        action=requirement_action
+    )
+    
     st.divider()
     
     # Screen button
@@ -461,39 +510,36 @@ def screen_resumes_tab(model_name: str, db: Database):
         else:
             with st.spinner("Screening resumes... This may take a few moments."):
                 try:
-                    agent = ResumeScreeningAgent(model_name=model_name)
+                    agent = ResumeScreeningAgent(model_name=model_name, rerank_top_k=rerank_top_k)
                     results = agent.screen_multiple_resumes(
                         st.session_state.job_description,
-                        st.session_state.resumes
+                        st.session_state.resumes,
+                        requirements=requirements
                     )
                     
                     st.session_state.screening_results = results
                     
-                    # Save to database if connected
+                    # Queue the results for saving; the outbox worker writes
+                    # them to the database in the background and retries on failure
                     if db.is_connected():
-                        job_id = db.save_job_description(
+                        get_outbox(db).enqueue_screening(
                             title="Job Position",
-                            description=st.session_state.job_description
+                            description=st.session_state.job_description,
+                            screenings=[
+                                {
+                                    "filename": result.get("filename", "unknown"),
+                                    "content": st.session_state.resumes[result["resume_index"]]["text"],
+                                    "email": result.get("metadata", {}).get("email"),
+                                    "phone": result.get("metadata", {}).get("phone"),
+                                    "score": result.get("score", 0),
+                                    "model_used": model_name,
+                                    "analysis": result,
+                                    "matched_skills": result.get("matched_skills", []),
+                                    "experience_years": result.get("experience_years", 0)
+                                }
+                                for result in results
+                            ]
                         )
-                        
-                        for result in results:
-                            resume_id = db.save_resume(
-                                filename=result.get("filename", "unknown"),
-                                content=st.session_state.resumes[result.get("rank", 1) - 1]["text"],
-                                email=result.get("metadata", {}).get("email"),
-                                phone=result.get("metadata", {}).get("phone")
-                            )
-                            
-                            if job_id and resume_id:
-                                db.save_screening_result(
-                                    job_id=job_id,
-                                    resume_id=resume_id,
-                                    score=result.get("score", 0),
-                                    model_used=model_name,
-                                    analysis=result,
-                                    matched_skills=result.get("matched_skills", []),
-                                    experience_years=result.get("experience_years", 0)
-                                )
                     
                     st.success(f"✅ Successfully screened {len(results)} resumes!")
                     st.balloons()
@@ -503,6 +549,61 @@ def screen_resumes_tab(model_name: str, db: Database):
                     st.info("Please check your API keys in the .env file")
 
 
+def add_parsed_resume(filename: str, document: Dict, quiet: bool = False) -> bool:
+    """Add a parsed resume document to the session, reporting limits hit"""
+    if document["truncation_reason"] == "max_bytes":
+        st.warning(f"⚠️ {filename} is too large and was skipped")
+        return False
+    
+    resume_text = document["text"]
+    # Sections are kept as offsets into the resume text, not copies of it
+    resume_sections = segment_resume(resume_text)
+    
+    st.session_state.resumes.append({
+        "text": resume_text,
+        "metadata": {
+            "filename": filename,
+            "name": resume_sections.get("name", ""),
+            "email": resume_sections.get("email", ""),
+            "phone": resume_sections.get("phone", ""),
+            "truncated": document["truncated"],
+            "sections": resume_sections["spans"]
+        }
+    })
+    
+    if document["truncated"]:
+        st.warning(f"⚠️ {filename} exceeds the {document['truncation_reason'].replace('max_', '')} limit; only the first part was parsed")
+    elif not quiet:
+        st.success(f"✅ {filename} parsed successfully")
+    return True
+
+
+def add_resume_archive(uploaded_file):
+    """Parse every resume inside an uploaded ZIP archive"""
+    parsed = 0
+    duplicates = 0
+    skipped = []
+    try:
+        with st.spinner(f"Extracting resumes from {uploaded_file.name}..."):
+            for record in iter_zip_resumes(uploaded_file, workers=4):
+                if record["status"] == "parsed":
+                    if add_parsed_resume(record["filename"], record["document"], quiet=True):
+                        parsed += 1
+                elif record["status"] == "duplicate":
+                    duplicates += 1
+                elif record["status"] == "error":
+                    st.error(f"❌ Error parsing {record['filename']}: {record['reason']}")
+                else:
+                    skipped.append(f"{record['filename']} ({record['reason']})")
+    except Exception as e:
+        st.error(f"❌ Error reading {uploaded_file.name}: {str(e)}")
+        return
+    
+    st.success(f"✅ {uploaded_file.name}: {parsed} resumes parsed, {duplicates} duplicates skipped")
+    if skipped:
+        st.warning(f"⚠️ Skipped {len(skipped)} files: {', '.join(skipped[:10])}")
+
+
 def results_tab():
     """Results display tab"""
     st.header("Screening Results")
@@ -569,8 +670,12 @@ def results_tab():
                 else:
                     st.markdown(f'<p class="score-low">{score:.1f}%</p>', unsafe_allow_html=True)
                 
-                st.metric("AI Score", f"{result.get('ai_score', 0):.1f}%")
-                st.metric("Vector Similarity", f"{result.get('vector_similarity', 0):.3f}")
+                if result.get("ai_score") is not None:
+                    st.metric("AI Score", f"{result.get('ai_score', 0):.1f}%")
+                if result.get("vector_similarity") is not None:
+                    st.metric("Vector Similarity", f"{result.get('vector_similarity', 0):.3f}")
+                if result.get("rerank_score") is not None:
+                    st.metric("Rerank Score", f"{result.get('rerank_score'):.3f}")
                 st.metric("Experience", f"{result.get('experience_years', 0):.1f} years")
             
             with col2:
@@ -582,6 +687,11 @@ def results_tab():
                 for weakness in result.get("weaknesses", []):
                     st.warning(f"• {weakness}")
             
+            prefilter = result.get("prefilter")
+            if prefilter and not prefilter.get("passed"):
+                label = "Rejected" if prefilter.get("action") == "reject" else "Flagged"
+                st.error(f"🚫 {label} by hard requirements: {'; '.join(prefilter.get('reasons', []))}")
+            
             st.markdown("### 🎯 Matched Requirements")
             for req in result.get("matched_requirements", []):
                 st.info(f"✓ {req}")
@@ -592,8 +702,13 @@ def results_tab():
             
             st.markdown("### 💡 Skills")
             skills = result.get("matched_skills", [])
+            confidence = result.get("skill_confidence", {})
             if skills:
-                st.write(", ".join(skills))
+                # Inferred (non-exact) skills show their confidence
+                st.write(", ".join(
+                    f"{skill} ({confidence[skill]:.2f})" if confidence.get(skill, 1.0) < 1.0 else skill
+                    for skill in skills
+                ))
             else:
                 st.write("No skills detected")
             
@@ -604,12 +719,15 @@ def results_tab():
     
     # Export options
     st.subheader("Export Results")
-    col1, col2, col3 = st.columns(3)
+    include_text = st.checkbox(
+        "Include long text fields (strengths, weaknesses, requirements, reasoning)",
+        value=True
+    )
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         if st.button("📥 Export to CSV"):
-            df_export = pd.DataFrame(st.session_state.screening_results)
-            csv = df_export.to_csv(index=False)
+            csv = "".join(iter_csv(st.session_state.screening_results, include_text=include_text))
             st.download_button(
                 label="Download CSV",
                 data=csv,
@@ -618,16 +736,30 @@ def results_tab():
             )
     
     with col2:
-        if st.button("📄 Export to JSON"):
-            json_data = json.dumps(st.session_state.screening_results, indent=2)
+        if st.button("📄 Export to JSON Lines"):
+            json_data = "".join(iter_jsonl(st.session_state.screening_results, include_text=include_text))
             st.download_button(
-                label="Download JSON",
+                label="Download JSON Lines",
                 data=json_data,
-                file_name=f"resume_screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json"
+                file_name=f"resume_screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+                mime="application/x-ndjson"
             )
     
     with col3:
+        if st.button("🗃️ Export to Parquet"):
+            try:
+                buffer = io.BytesIO()
+                export_to_parquet(st.session_state.screening_results, buffer, include_text=include_text)
+                st.download_button(
+                    label="Download Parquet",
+                    data=buffer.getvalue(),
+                    file_name=f"resume_screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+                    mime="application/vnd.apache.parquet"
+                )
+            except ImportError as e:
+                st.error(str(e))
+    
+    with col4:
         sheets_integration = GoogleSheetsIntegration()
         if sheets_integration.client:
             spreadsheet_id = st.text_input("Google Sheets ID", placeholder="Enter spreadsheet ID")
@@ -646,11 +778,39 @@ def history_tab(db: Database):
     st.header("Screening History")
     
     if not db.is_connected():
-        st.warning("Supabase is not connected. History features are unavailable.")
-        st.info("To enable history, configure SUPABASE_URL and SUPABASE_KEY in your .env file")
+        st.warning("Database is not connected. History features are unavailable.")
+        st.info("To enable history, configure SUPABASE_URL and SUPABASE_KEY in your .env file, or set DATABASE_BACKEND=sqlite")
         return
     
-    history = db.get_screening_history(limit=50)
+    # Aggregates are computed by the database, not over the fetched page,
+    # and only loaded on request
+    with st.expander("📊 Job and Model Analytics"):
+        if st.button("Load Analytics", key="load_analytics"):
+            st.session_state.analytics = {
+                "jobs": db.get_job_stats(limit=20),
+                "models": db.get_model_stats(),
+                "agreement": db.get_model_agreement()
+            }
+        analytics = st.session_state.get("analytics")
+        if analytics and analytics["jobs"]:
+            st.markdown("**Per job**")
+            st.dataframe(pd.DataFrame(analytics["jobs"]).drop(columns=["job_id"]), use_container_width=True, hide_index=True)
+            st.markdown("**Per model**")
+            st.dataframe(pd.DataFrame(analytics["models"]), use_container_width=True, hide_index=True)
+            if analytics["agreement"]:
+                st.markdown("**Model agreement** (same resume screened for the same job)")
+                st.dataframe(pd.DataFrame(analytics["agreement"]), use_container_width=True, hide_index=True)
+        elif analytics:
+            st.info("No screenings to analyze yet.")
+    
+    page_size = 50
+    refresh = st.button("🔄 Refresh History")
+    if refresh or 'history' not in st.session_state:
+        st.session_state.history = db.get_screening_history(limit=page_size)
+        st.session_state.history_complete = len(st.session_state.history) < page_size
+        st.session_state.history_details = {}
+    
+    history = st.session_state.history
     
     if not history:
         st.info("No screening history found.")
@@ -664,18 +824,85 @@ def history_tab(db: Database):
             
             with col1:
                 st.write("**Job Description:**")
-                job_desc = item.get('job_descriptions', {})
+                job_desc = item.get('job_descriptions') or {}
                 st.write(f"Title: {job_desc.get('title', 'N/A')}")
                 st.write(f"Company: {job_desc.get('company', 'N/A')}")
             
             with col2:
                 st.write("**Resume:**")
-                resume = item.get('resumes', {})
+                resume = item.get('resumes') or {}
                 st.write(f"Filename: {resume.get('filename', 'N/A')}")
                 st.write(f"Email: {resume.get('email', 'N/A')}")
             
             st.write(f"**Score:** {item.get('score', 0):.1f}%")
             st.write(f"**Model:** {item.get('model_used', 'N/A')}")
+            
+            # The analysis and full texts are only fetched when asked for
+            details = st.session_state.history_details.get(item['id'])
+            if details is None and st.button("Show details", key=f"history_detail_{item['id']}"):
+                details = db.get_screening_detail(item['id'], item.get('created_at')) or {}
+                st.session_state.history_details[item['id']] = details
+            if details:
+                analysis = details.get('analysis') or {}
+                if isinstance(analysis, str):
+                    analysis = json.loads(analysis)
+                st.write(f"**Recommendation:** {analysis.get('recommendation', 'N/A')}")
+                st.write(f"**Skills:** {', '.join(details.get('matched_skills') or []) or 'None detected'}")
+                st.write("**Reasoning:**")
+                st.write(analysis.get('reasoning', 'No reasoning provided'))
+    
+    if not st.session_state.history_complete and st.button("Load more"):
+        last = history[-1]
+        page = db.get_screening_history(limit=page_size, before=(last['created_at'], last['id']))
+        st.session_state.history.extend(page)
+        st.session_state.history_complete = len(page) < page_size
+        st.rerun()
+
+
+def talent_pool_tab(db: Database):
+    """Keyword search over every stored resume"""
+    st.header("Talent Pool")
+    
+    if not db.is_connected():
+        st.warning("Database is not connected. Talent pool search is unavailable.")
+        return
+    
+    page_size = 20
+    query = st.text_input(
+        "Search past candidates",
+        placeholder='e.g. kubernetes "machine learning" -intern',
+        help="Searches the text of every stored resume. All words must match; use \"quotes\" for phrases, OR for alternatives and -word to exclude"
+    )
+    
+    if query != st.session_state.get("talent_query"):
+        st.session_state.talent_query = query
+        st.session_state.talent_page = 0
+    
+    if not query.strip():
+        return
+    
+    page = st.session_state.talent_page
+    matches = db.search_resumes(query, limit=page_size, offset=page * page_size)
+    
+    if not matches:
+        st.info("No matching resumes found." if page == 0 else "No more matches.")
+    
+    for match in matches:
+        with st.container(border=True):
+            st.markdown(f"**{match.get('filename', 'unknown')}**  ·  {match.get('email') or 'no email'}")
+            st.caption(f"Added {match.get('created_at', 'N/A')}  ·  relevance {match.get('rank', 0):.3f}")
+            if match.get("snippet"):
+                st.write(match["snippet"])
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if page > 0 and st.button("← Previous", key="talent_previous"):
+            st.session_state.talent_page -= 1
+            st.rerun()
+    with col2:
+        if len(matches) == page_size and st.button("Next →", key="talent_next"):
+            st.session_state.talent_page += 1
+            st.rerun()
 
 
 def settings_tab():
@@ -688,7 +915,7 @@ def settings_tab():
     st.markdown("""
     ### Required API Keys:
     - **OPENAI_API_KEY**: For OpenAI GPT models
-    - **SUPABASE_URL** and **SUPABASE_KEY**: For database features
+    - **SUPABASE_URL** and **SUPABASE_KEY**: For database features (without them, results are stored in a local SQLite file)
     
     ### Optional API Keys:
     - **ANTHROPIC_API_KEY**: For Claude models
@@ -703,13 +930,13 @@ def settings_tab():
     st.subheader("Database Connection")
     
     # Test connection button
-    db = Database()
+    db = get_database()
     col1, col2 = st.columns(2)
     
     with col1:
         if st.button("🔍 Test Database Connection", use_container_width=True):
             with st.spinner("Testing connection..."):
-                test_result = db.test_connection()
+                test_result = get_connection_health(db).refresh()
                 
                 if test_result["connected"]:
                     st.success(test_result["message"])
@@ -772,7 +999,7 @@ def settings_tab():
     # Show current connection status
     st.subheader("Current Connection Status")
     if db.is_connected():
-        test_result = db.test_connection()
+        test_result = get_connection_health(db).status()
         if test_result["connected"]:
             st.success(f"✅ {test_result['message']}")
         else:
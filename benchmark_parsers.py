@@ -0,0 +1,65 @@
+"""
+DOCX Parser Benchmark Script
+Run this script to compare the streaming DOCX reader with the python-docx path
+"""
+import io
+import time
+from docx import Document
+from src.parsers import parse_docx, parse_docx_dom
+
+
+def build_sample_docx(paragraphs: int) -> bytes:
+    """Build a synthetic resume-like DOCX with a header and a skills table"""
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane.doe@example.com | +1 555 123 4567"
+
+    doc.add_paragraph("Professional Experience")
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Led project {i}: built Python services on Kubernetes and AWS")
+
+    doc.add_paragraph("Skills")
+    table = doc.add_table(rows=10, cols=2)
+    for row in range(10):
+        table.cell(row, 0).text = f"Category {row}"
+        table.cell(row, 1).text = "Python, SQL, Docker, Kubernetes"
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def time_parser(parser, file_content: bytes, runs: int = 5) -> float:
+    """Return the best wall time of several runs in milliseconds"""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        parser(file_content)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Benchmark DOCX parsing"""
+    print("=" * 60)
+    print("DOCX Parser Benchmark")
+    print("=" * 60)
+    print()
+
+    print(f"{'Paragraphs':>10} {'Size (KB)':>10} {'python-docx (ms)':>18} {'streaming (ms)':>16} {'Speedup':>8}")
+    for paragraphs in (50, 500, 5000, 20000):
+        file_content = build_sample_docx(paragraphs)
+        dom_ms = time_parser(parse_docx_dom, file_content)
+        stream_ms = time_parser(parse_docx, file_content)
+        print(f"{paragraphs:>10} {len(file_content) / 1024:>10.1f} {dom_ms:>18.1f} {stream_ms:>16.1f} {dom_ms / stream_ms:>7.1f}x")
+
+    print()
+    sample = build_sample_docx(5)
+    print(f"python-docx extracted {len(parse_docx_dom(sample))} characters (body paragraphs only)")
+    print(f"streaming extracted   {len(parse_docx(sample))} characters (header, body and tables)")
+    print()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,62 @@
 Supabase database integration
 """
 import os
-from supabase import create_client, Client
-from typing import List, Dict, Optional
-from datetime import datetime
+import time
+import uuid
+import threading
+from typing import List, Dict, Iterator, Optional, Tuple
+from datetime import datetime, timezone
 import json
 
+try:
+    from supabase import create_client, Client
+except ImportError:
+    create_client = None
+
+try:
+    from .sqlite_database import SQLiteDatabase
+    from .utils import content_hash, trim_analysis, utc_timestamp
+except ImportError:
+    from src.sqlite_database import SQLiteDatabase
+    from src.utils import content_hash, trim_analysis, utc_timestamp
+
+
+DATABASE_BACKENDS = ("auto", "supabase", "sqlite")
+SETUP_SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "supabase_setup.sql")
+
+# History lists only what the history tab renders; the heavy fields (analysis,
+# resume content, job description) are fetched per row by get_screening_detail
+HISTORY_COLUMNS = (
+    "id, created_at, score, model_used, experience_years, job_description_id, resume_id, "
+    "job_descriptions(title, company), resumes(filename, email)"
+)
+DETAIL_COLUMNS = "id, analysis, matched_skills, job_descriptions(description), resumes(content, phone)"
+CANDIDATE_COLUMNS = (
+    "id, created_at, score, experience_years, resume_id, "
+    "recommendation:analysis->>recommendation, ai_score:analysis->ai_score, "
+    "resumes(filename, email)"
+)
+# Every stored column, as written to retention archives
+ARCHIVE_COLUMNS = (
+    "id, created_at, job_description_id, resume_id, score, model_used, analysis, "
+    "matched_skills, experience_years"
+)
+
 
 class Database:
     """Supabase database operations"""
     
+    backend = "supabase"
+    
     def __init__(self):
         """Initialize Supabase client"""
         supabase_url = os.getenv("SUPABASE_URL")
         supabase_key = os.getenv("SUPABASE_KEY")
         
-        if not supabase_url or not supabase_key:
+        if create_client is None:
+            self.client = None
+            print("Warning: supabase package not installed. Database features will be disabled.")
+        elif not supabase_url or not supabase_key:
             self.client = None
             print("Warning: Supabase credentials not found. Database features will be disabled.")
         else:
@@ -92,54 +133,42 @@ class Database:
         return result
     
     def create_tables(self):
-        """Create necessary tables in Supabase (SQL to run in Supabase SQL editor)"""
-        sql = """
-        -- Create job_descriptions table
-        CREATE TABLE IF NOT EXISTS job_descriptions (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            title TEXT NOT NULL,
-            description TEXT NOT NULL,
-            company TEXT,
-            created_at TIMESTAMP DEFAULT NOW(),
-            updated_at TIMESTAMP DEFAULT NOW()
-        );
-        
-        -- Create resumes table
-        CREATE TABLE IF NOT EXISTS resumes (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            filename TEXT NOT NULL,
-            content TEXT NOT NULL,
-            email TEXT,
-            phone TEXT,
-            created_at TIMESTAMP DEFAULT NOW()
-        );
-        
-        -- Create screening_results table
-        CREATE TABLE IF NOT EXISTS screening_results (
-            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
-            job_description_id UUID REFERENCES job_descriptions(id),
-            resume_id UUID REFERENCES resumes(id),
-            score FLOAT NOT NULL,
-            model_used TEXT,
-            analysis JSONB,
-            matched_skills TEXT[],
-            experience_years FLOAT,
-            created_at TIMESTAMP DEFAULT NOW()
-        );
+        """Return the setup SQL to run in the Supabase SQL editor
+        
+        This is supabase_setup.sql, the single source of the schema: the
+        tables, the monthly screening_results partitions and the functions
+        that manage them, indexes and views.
         """
-        return sql
+        try:
+            with open(SETUP_SQL_PATH, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError as e:
+            return f"-- Could not read {SETUP_SQL_PATH} ({e}).\n-- Run supabase_setup.sql from the project in the SQL editor."
     
-    def save_job_description(self, title: str, description: str, company: str = None) -> Optional[str]:
-        """Save job description to database"""
+    def save_job_description(self, title: str, description: str, company: str = None,
+                             job_id: str = None) -> Optional[str]:
+        """Save job description to database
+        
+        A client-generated job_id makes the save idempotent: saving the same
+        id again leaves the existing row in place.
+        """
         if not self.is_connected():
             return None
         
+        row = {
+            "title": title,
+            "description": description,
+            "company": company
+        }
         try:
-            result = self.client.table("job_descriptions").insert({
-                "title": title,
-                "description": description,
-                "company": company
-            }).execute()
+            if job_id:
+                row["id"] = job_id
+                self.client.table("job_descriptions")\
+                    .upsert(row, on_conflict="id", ignore_duplicates=True)\
+                    .execute()
+                return job_id
+            
+            result = self.client.table("job_descriptions").insert(row).execute()
             
             if result.data:
                 return result.data[0]['id']
@@ -148,21 +177,42 @@ class Database:
         
         return None
     
+    def _find_resume(self, resume_hash: str) -> Optional[str]:
+        result = self.client.table("resumes")\
+            .select("id")\
+            .eq("content_hash", resume_hash)\
+            .limit(1)\
+            .execute()
+        return result.data[0]['id'] if result.data else None
+    
     def save_resume(self, filename: str, content: str, email: str = None, phone: str = None) -> Optional[str]:
-        """Save resume to database"""
+        """Save resume to database
+        
+        Resumes are keyed by the hash of their content: a resume that is
+        already stored is not sent again, and its existing id is returned.
+        """
         if not self.is_connected():
             return None
         
         try:
-            result = self.client.table("resumes").insert({
+            resume_hash = content_hash(content)
+            resume_id = self._find_resume(resume_hash)
+            if resume_id:
+                return resume_id
+            
+            # A concurrent insert of the same resume leaves the existing row
+            # in place, and it is looked up again below
+            result = self.client.table("resumes").upsert({
                 "filename": filename,
                 "content": content,
+                "content_hash": resume_hash,
                 "email": email,
                 "phone": phone
-            }).execute()
+            }, on_conflict="content_hash", ignore_duplicates=True).execute()
             
             if result.data:
                 return result.data[0]['id']
+            return self._find_resume(resume_hash)
         except Exception as e:
             print(f"Error saving resume: {e}")
         
@@ -170,38 +220,84 @@ class Database:
     
     def save_screening_result(self, job_id: str, resume_id: str, score: float, 
                              model_used: str, analysis: Dict, matched_skills: List[str] = None,
-                             experience_years: float = None) -> Optional[str]:
+                             experience_years: float = None, result_id: str = None,
+                             created_at: str = None) -> Optional[str]:
         """Save screening result to database"""
-        if not self.is_connected():
-            return None
+        return self.save_screening_results([{
+            "job_id": job_id,
+            "resume_id": resume_id,
+            "score": score,
+            "model_used": model_used,
+            "analysis": analysis,
+            "matched_skills": matched_skills,
+            "experience_years": experience_years,
+            "result_id": result_id,
+            "created_at": created_at
+        }])[0]
+    
+    def save_screening_results(self, results: List[Dict]) -> List[Optional[str]]:
+        """Save many screening results in a single request
         
+        Each item holds the keyword arguments of save_screening_result. Ids
+        and created_at are generated client-side (or taken from result_id and
+        created_at), so a retried save hits the same (id, created_at) primary
+        key of the partitioned table and does not insert the results twice.
+        """
+        if not self.is_connected() or not results:
+            return [None] * len(results)
+        
+        ids = [item.get("result_id") or str(uuid.uuid4()) for item in results]
+        now = utc_timestamp()
         try:
-            result = self.client.table("screening_results").insert({
-                "job_description_id": job_id,
-                "resume_id": resume_id,
-                "score": score,
-                "model_used": model_used,
-                "analysis": json.dumps(analysis),
-                "matched_skills": matched_skills or [],
-                "experience_years": experience_years
-            }).execute()
+            self.client.table("screening_results").upsert([
+                {
+                    "id": result_id,
+                    "job_description_id": item["job_id"],
+                    "resume_id": item["resume_id"],
+                    "score": item["score"],
+                    "model_used": item["model_used"],
+                    # Sent as a JSON object so Postgres stores native JSONB
+                    "analysis": trim_analysis(item["analysis"]),
+                    "matched_skills": item.get("matched_skills") or [],
+                    "experience_years": item.get("experience_years"),
+                    "created_at": item.get("created_at") or now
+                }
+                for result_id, item in zip(ids, results)
+            ], on_conflict="id,created_at", ignore_duplicates=True).execute()
             
-            if result.data:
-                return result.data[0]['id']
+            return ids
         except Exception as e:
-            print(f"Error saving screening result: {e}")
+            print(f"Error saving screening results: {e}")
         
-        return None
+        return [None] * len(results)
     
-    def get_screening_history(self, limit: int = 50) -> List[Dict]:
-        """Get screening history"""
+    def get_screening_history(self, limit: int = 50, before: Optional[Tuple[str, str]] = None,
+                              since: str = None) -> List[Dict]:
+        """Get one page of screening history, newest first
+        
+        Pages with a keyset cursor instead of an offset: pass the
+        (created_at, id) of the last row of the previous page as before.
+        Only the columns in HISTORY_COLUMNS are returned. Ordering by the
+        partition key lets Postgres read the newest monthly partitions first
+        and stop at the limit; since (a created_at lower bound) also prunes
+        older partitions from the plan.
+        """
         if not self.is_connected():
             return []
         
         try:
-            result = self.client.table("screening_results")\
-                .select("*, job_descriptions(*), resumes(*)")\
+            query = self.client.table("screening_results").select(HISTORY_COLUMNS)
+            if since:
+                query = query.gte("created_at", since)
+            if before:
+                created_at, result_id = before
+                query = query.or_(
+                    f'created_at.lt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.lt.{result_id})'
+                )
+            result = query\
                 .order("created_at", desc=True)\
+                .order("id", desc=True)\
                 .limit(limit)\
                 .execute()
             
@@ -209,4 +305,291 @@ class Database:
         except Exception as e:
             print(f"Error fetching screening history: {e}")
             return []
+    
+    def get_top_candidates(self, job_id: str, recommendation: str = "HIRE", limit: int = 10,
+                           min_score: float = None, since: str = None) -> List[Dict]:
+        """Get the best scored results for a job with a given recommendation
+        
+        Filtered and sorted in Postgres on the indexed analysis->>'recommendation'.
+        Pass since (e.g. the job's created_at) to skip partitions from before it.
+        """
+        if not self.is_connected():
+            return []
+        
+        try:
+            query = self.client.table("screening_results")\
+                .select(CANDIDATE_COLUMNS)\
+                .eq("job_description_id", job_id)\
+                .eq("analysis->>recommendation", recommendation)
+            if min_score is not None:
+                query = query.gte("score", min_score)
+            if since:
+                query = query.gte("created_at", since)
+            result = query.order("score", desc=True).limit(limit).execute()
+            
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error fetching top candidates: {e}")
+            return []
+    
+    def search_resumes(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """Search stored resumes by keyword, best matches first
+        
+        Runs the search_resumes RPC over the GIN-indexed search_vector column.
+        The query accepts web search syntax: quoted phrases, OR and -term.
+        Each row has id, filename, email, created_at, rank and snippet.
+        """
+        if not self.is_connected() or not query.strip():
+            return []
+        
+        try:
+            result = self.client.rpc("search_resumes", {
+                "search_query": query,
+                "result_limit": limit,
+                "result_offset": offset
+            }).execute()
+            
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error searching resumes: {e}")
+            return []
+    
+    def get_job_stats(self, job_id: str = None, limit: int = 50, materialized: bool = False) -> List[Dict]:
+        """Get per-job score statistics and recommendation counts
+        
+        Computed by the job_screening_stats view; materialized=True reads the
+        precomputed job_screening_stats_mv instead (see refresh_stats).
+        """
+        if not self.is_connected():
+            return []
+        
+        try:
+            query = self.client.table("job_screening_stats_mv" if materialized else "job_screening_stats")\
+                .select("*")
+            if job_id:
+                query = query.eq("job_id", job_id)
+            result = query.order("last_screened_at", desc=True).limit(limit).execute()
+            
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error fetching job statistics: {e}")
+            return []
+    
+    def get_model_stats(self, materialized: bool = False) -> List[Dict]:
+        """Get per-model score statistics and recommendation counts"""
+        if not self.is_connected():
+            return []
+        
+        try:
+            result = self.client.table("model_screening_stats_mv" if materialized else "model_screening_stats")\
+                .select("*")\
+                .order("screenings", desc=True)\
+                .execute()
+            
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error fetching model statistics: {e}")
+            return []
+    
+    def get_model_agreement(self) -> List[Dict]:
+        """Get how often each pair of models agrees on the same job and resume"""
+        if not self.is_connected():
+            return []
+        
+        try:
+            result = self.client.table("model_agreement_stats")\
+                .select("*")\
+                .order("shared_screenings", desc=True)\
+                .execute()
+            
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error fetching model agreement: {e}")
+            return []
+    
+    def refresh_stats(self) -> bool:
+        """Refresh the materialized statistics views"""
+        if not self.is_connected():
+            return False
+        
+        try:
+            self.client.rpc("refresh_screening_stats").execute()
+            return True
+        except Exception as e:
+            print(f"Error refreshing statistics: {e}")
+            return False
+    
+    def get_screening_detail(self, result_id: str, created_at: str = None) -> Optional[Dict]:
+        """Get the heavy fields of one screening result
+        
+        Pass the row's created_at (history rows have it) so only its
+        partition is searched instead of every partition's primary key.
+        """
+        if not self.is_connected():
+            return None
+        
+        try:
+            query = self.client.table("screening_results")\
+                .select(DETAIL_COLUMNS)\
+                .eq("id", result_id)
+            if created_at:
+                query = query.eq("created_at", created_at)
+            result = query.limit(1).execute()
+            
+            return result.data[0] if result.data else None
+        except Exception as e:
+            print(f"Error fetching screening detail: {e}")
+            return None
+    
+    def ensure_partitions(self, months_ahead: int = 3) -> bool:
+        """Create the monthly screening_results partitions up to months_ahead from now"""
+        if not self.is_connected():
+            return False
+        
+        try:
+            self.client.rpc("create_screening_partitions", {"months_ahead": months_ahead}).execute()
+            return True
+        except Exception as e:
+            print(f"Error creating screening partitions: {e}")
+            return False
+    
+    def retention_boundary(self, cutoff: str) -> str:
+        """Round a retention cutoff down to the start of its month
+        
+        Only whole monthly partitions are dropped, so rows from the month
+        of the cutoff are kept until a later run.
+        """
+        month_start = datetime.fromisoformat(cutoff).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        return utc_timestamp(month_start.replace(tzinfo=timezone.utc))
+    
+    def iter_screening_results_before(self, before: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Yield every screening result created before a timestamp, oldest first
+        
+        Reads ARCHIVE_COLUMNS in keyset-paged batches. Errors are raised
+        rather than printed, so a caller archiving the rows never mistakes
+        a failed read for the end of the data.
+        """
+        if not self.is_connected():
+            raise ConnectionError("Supabase is not connected")
+        
+        after = None
+        while True:
+            query = self.client.table("screening_results")\
+                .select(ARCHIVE_COLUMNS)\
+                .lt("created_at", before)
+            if after:
+                created_at, result_id = after
+                query = query.or_(
+                    f'created_at.gt."{created_at}",'
+                    f'and(created_at.eq."{created_at}",id.gt.{result_id})'
+                )
+            rows = query\
+                .order("created_at")\
+                .order("id")\
+                .limit(batch_size)\
+                .execute().data or []
+            
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1]["created_at"], rows[-1]["id"])
+    
+    def purge_screening_results(self, before: str) -> Optional[int]:
+        """Drop the monthly partitions that end on or before a timestamp
+        
+        Returns the number of partitions dropped, or None on error. Dropping
+        a partition is instant, unlike deleting its rows.
+        """
+        if not self.is_connected():
+            return None
+        
+        try:
+            result = self.client.rpc("drop_screening_partitions", {"older_than": before}).execute()
+            return result.data or 0
+        except Exception as e:
+            print(f"Error dropping screening partitions: {e}")
+            return None
+
+
+_databases = {}
+_health_checks = {}
+_shared_lock = threading.Lock()
+
+HEALTH_CHECK_TTL = 60.0
+
+
+def get_database(backend: str = None):
+    """Get the process-wide instance of the configured storage backend
+    
+    DATABASE_BACKEND selects "supabase", "sqlite" or "auto" (the default):
+    Supabase when SUPABASE_URL and SUPABASE_KEY are set, otherwise the local
+    SQLite file at SQLITE_PATH. The client is created once and shared by
+    every Streamlit session and rerun.
+    """
+    backend = (backend or os.getenv("DATABASE_BACKEND", "auto")).lower()
+    if backend not in DATABASE_BACKENDS:
+        raise ValueError(f"Unsupported database backend: {backend}. Supported: {', '.join(DATABASE_BACKENDS)}")
+    
+    if backend == "auto":
+        has_credentials = os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY")
+        backend = "supabase" if has_credentials and create_client is not None else "sqlite"
+    
+    with _shared_lock:
+        if backend not in _databases:
+            _databases[backend] = SQLiteDatabase() if backend == "sqlite" else Database()
+        return _databases[backend]
+
+
+class ConnectionHealth:
+    """test_connection() result cached for ttl seconds
+    
+    Only the first check blocks. Once the cached status is older than ttl,
+    status() still returns it at once and a background thread refreshes it.
+    """
+    
+    def __init__(self, database, ttl: float = HEALTH_CHECK_TTL):
+        self.database = database
+        self.ttl = ttl
+        self._status: Optional[Dict] = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+    
+    def refresh(self) -> Dict:
+        """Run test_connection() now and cache the result"""
+        status = self.database.test_connection()
+        with self._lock:
+            self._status = status
+            self._checked_at = time.time()
+            self._refreshing = False
+        return status
+    
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Warning: Connection health check failed: {e}")
+            with self._lock:
+                self._refreshing = False
+    
+    def status(self) -> Dict:
+        """Return the cached connection status, refreshing it if stale"""
+        with self._lock:
+            status = self._status
+            stale = time.time() - self._checked_at > self.ttl
+            if status is not None and stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        
+        if status is None:
+            status = self.refresh()
+        return status
+
 
+def get_connection_health(database=None) -> ConnectionHealth:
+    """Get the cached health status of a database (the configured one by default)"""
+    database = database or get_database()
+    with _shared_lock:
+        if id(database) not in _health_checks:
+            _health_checks[id(database)] = ConnectionHealth(database)
+        return _health_checks[id(database)]
@@ -0,0 +1,156 @@
+"""
+Employment date range extraction and tenure calculation
+"""
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+
+MONTH_NAMES = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+_MONTH = r'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?'
+_YEAR = r'(?:19|20)\d{2}'
+
+
+def _date_pattern(prefix: str) -> str:
+    """Month-name date, numeric month/year or bare year, with named groups"""
+    return (
+        rf'(?:(?P<{prefix}_month_name>{_MONTH})\.?,?\s*(?P<{prefix}_month_name_year>{_YEAR})'
+        rf'|(?P<{prefix}_month>0?[1-9]|1[0-2])[/.](?P<{prefix}_month_year>{_YEAR})'
+        rf'|(?P<{prefix}_year>{_YEAR}))'
+    )
+
+
+# "Jan 2019 - Present", "03/2017 to 11/2019", "2015-2018", ...
+DATE_RANGE_PATTERN = re.compile(
+    r'\b' + _date_pattern('start')
+    + r'\s*(?:-|–|—|to|until|till|through|thru)\s*'
+    + r'(?:(?P<present>present|current|now|today|date)|' + _date_pattern('end') + r')\b',
+    re.IGNORECASE
+)
+
+# Fallback when no dates are found: "5+ years of experience", "3 yrs experience"
+STATED_EXPERIENCE_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)\+?\s*(?:years?|yrs?)\.?(?:\s+of)?(?:\s+[a-z-]+){0,3}?\s+experience',
+    re.IGNORECASE
+)
+
+MIN_YEAR = 1950
+
+
+def _parse_date(match, prefix: str) -> Optional[Tuple[int, bool]]:
+    """Return (month index, has month precision) for a matched date"""
+    if match.group(f'{prefix}_month_name'):
+        month = MONTH_NAMES[match.group(f'{prefix}_month_name')[:3].lower()]
+        return int(match.group(f'{prefix}_month_name_year')) * 12 + month - 1, True
+    if match.group(f'{prefix}_month'):
+        return int(match.group(f'{prefix}_month_year')) * 12 + int(match.group(f'{prefix}_month')) - 1, True
+    if match.group(f'{prefix}_year'):
+        return int(match.group(f'{prefix}_year')) * 12, False
+    return None
+
+
+def _format_month(month_index: int) -> str:
+    return f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+
+
+def _iter_date_ranges(text: str, spans: Optional[List[List[int]]]):
+    if not spans:
+        yield from DATE_RANGE_PATTERN.finditer(text)
+        return
+    for start, end in spans:
+        yield from DATE_RANGE_PATTERN.finditer(text, start, end)
+
+
+def extract_date_ranges(text: str, today: Optional[date] = None,
+                        spans: Optional[List[List[int]]] = None) -> List[Dict]:
+    """Extract employment date ranges as half-open month intervals
+
+    Each range records its start and end month (end is exclusive), its
+    length in months and the line it appeared on, which usually names the
+    role. Bare years count from January to December, so "2015-2018" is
+    four years, the same as "Jan 2015 - Dec 2018".
+    spans limits the scan to [start, end] offsets into text, e.g. the
+    experience section from parsers.segment_resume.
+    """
+    today = today or date.today()
+    current_month = today.year * 12 + today.month - 1
+    ranges = []
+
+    for match in _iter_date_ranges(text, spans):
+        start, _ = _parse_date(match, 'start')
+        if match.group('present'):
+            end = current_month + 1
+        else:
+            end, has_month = _parse_date(match, 'end')
+            # The end date is inclusive: through its month, or through
+            # December of a bare year ("2018 - 2018" is one year)
+            end += 1 if has_month else 12
+
+        end = min(end, current_month + 1)
+        if start // 12 < MIN_YEAR or end <= start:
+            continue
+
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        line_end = text.find('\n', match.end())
+        if line_end == -1:
+            line_end = len(text)
+
+        ranges.append({
+            'start': _format_month(start),
+            'end': 'present' if match.group('present') else _format_month(end - 1),
+            'months': end - start,
+            'years': round((end - start) / 12, 1),
+            'line': text[line_start:line_end].strip()[:120],
+            'interval': (start, end)
+        })
+
+    return ranges
+
+
+def merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping or adjacent half-open intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def extract_experience(text: str, today: Optional[date] = None,
+                       spans: Optional[List[List[int]]] = None) -> Dict:
+    """Compute total and per-role tenure from employment date ranges
+
+    Overlapping roles are merged, so concurrent jobs are not double counted.
+    Pass the experience section's spans to leave out education and other
+    dated sections; if the spans hold no date ranges the whole text is
+    scanned, in case the section was misdetected. When there are no date
+    ranges, the largest explicitly stated "N years of experience" anywhere
+    in the text is used instead.
+    """
+    roles = extract_date_ranges(text, today=today, spans=spans)
+    if spans and not roles:
+        roles = extract_date_ranges(text, today=today)
+    merged = merge_intervals([role.pop('interval') for role in roles])
+    total_months = sum(end - start for start, end in merged)
+
+    if roles:
+        total_years = round(total_months / 12, 1)
+        source = 'date_ranges'
+    else:
+        stated = [float(years) for years in STATED_EXPERIENCE_PATTERN.findall(text)]
+        total_years = max(stated) if stated else 0.0
+        source = 'stated' if stated else None
+
+    return {
+        'total_years': total_years,
+        'total_months': total_months,
+        'roles': roles,
+        'periods': [{'start': _format_month(start), 'end': _format_month(end - 1)} for start, end in merged],
+        'source': source
+    }
@@ -0,0 +1,154 @@
+"""
+Lexical (BM25) inverted index kept alongside the vector store
+"""
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Keep characters like "+", "#" and "." inside tokens so that skills such as
+# "C++", "C#" and "Node.js" survive tokenization
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase BM25 terms"""
+    if not text:
+        return []
+    return [token.rstrip('.') for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+class BM25Index:
+    """In-memory BM25 inverted index with an optional append-only log on disk
+
+    One index is shared by every session in the process, so reads and
+    writes are serialized by a lock.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        """Initialize the index and replay the on-disk log if present"""
+        self.log_path = log_path
+        self.k1 = k1
+        self.b = b
+
+        # term -> {doc_id: term frequency}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+        self._lock = threading.RLock()
+
+        if log_path and os.path.exists(log_path):
+            self._replay_log()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            return doc_id in self.doc_lengths
+
+    def _replay_log(self):
+        """Rebuild the in-memory index from the append-only log"""
+        with self._lock, open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Skip a partially written trailing line
+                    continue
+                self._index_counts(entry['id'], entry['tf'])
+
+    def _index_counts(self, doc_id: str, term_counts: Dict[str, int]):
+        """Add precomputed term counts for a document"""
+        if doc_id in self.doc_lengths:
+            return
+
+        length = 0
+        for term, count in term_counts.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+            length += count
+
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+
+    def add(self, doc_id: str, text: str, persist: bool = True):
+        """Index a document; documents already present are ignored"""
+        term_counts = dict(Counter(tokenize(text)))
+        with self._lock:
+            if doc_id in self.doc_lengths:
+                return
+            self._index_counts(doc_id, term_counts)
+
+            if persist and self.log_path:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'id': doc_id, 'tf': term_counts}) + '\n')
+
+    def add_many(self, documents: Iterable[Tuple[str, str]], persist: bool = True):
+        """Index several (doc_id, text) pairs with a single log write"""
+        lines = []
+        with self._lock:
+            for doc_id, text in documents:
+                if doc_id in self.doc_lengths:
+                    continue
+                term_counts = dict(Counter(tokenize(text)))
+                self._index_counts(doc_id, term_counts)
+                lines.append(json.dumps({'id': doc_id, 'tf': term_counts}) + '\n')
+
+            if persist and self.log_path and lines:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.writelines(lines)
+
+    def clear(self):
+        """Drop all documents and the on-disk log"""
+        with self._lock:
+            self.postings = {}
+            self.doc_lengths = {}
+            self.total_length = 0
+            if self.log_path and os.path.exists(self.log_path):
+                os.remove(self.log_path)
+
+    def search(self, query: str, top_k: int = 10,
+               max_query_terms: int = 32) -> List[Tuple[str, float]]:
+        """Return the top_k (doc_id, bm25_score) pairs for a query"""
+        query_terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+        with self._lock:
+            num_docs = len(self.doc_lengths)
+            if num_docs == 0:
+                return []
+
+            avg_length = self.total_length / num_docs
+
+            # A job description has hundreds of terms; only the most selective
+            # ones (shortest posting lists) are scored to keep queries fast
+            query_postings = [self.postings[term] for term in query_terms if term in self.postings]
+            query_postings.sort(key=len)
+
+            # Only documents that share at least one term with the query are scored
+            for postings in query_postings[:max_query_terms]:
+                idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], weights: Optional[List[float]] = None,
+                           k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse several ranked id lists with weighted reciprocal rank fusion"""
+    if weights is None:
+        weights = [1.0] * len(rankings)
+
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
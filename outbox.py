@@ -0,0 +1,247 @@
+"""
+Durable write-behind outbox that saves screenings to the database in the background
+"""
+import os
+import json
+import time
+import uuid
+import random
+import sqlite3
+import threading
+from typing import List, Dict, Optional
+
+try:
+    from .database import get_database
+    from .utils import job_description_id, utc_timestamp
+except ImportError:
+    from src.database import get_database
+    from src.utils import job_description_id, utc_timestamp
+
+
+DEFAULT_OUTBOX_PATH = "./outbox.db"
+DEFAULT_MAX_ATTEMPTS = 10
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    dead_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_next_attempt_at ON outbox(next_attempt_at);
+"""
+
+
+class OutboxWriteError(Exception):
+    """A database write reported failure and should be retried"""
+
+
+class ScreeningOutbox:
+    """Local SQLite outbox drained into the database by a worker thread
+
+    Each entry is one screening run: the job description, the resumes and
+    their results. Entries are committed locally before enqueue returns, so a
+    database outage or an app restart does not lose them. Failed entries are
+    retried with exponential backoff. Every row carries a client-generated id
+    assigned at enqueue time, so a retry after a partial write does not
+    duplicate anything. An entry that fails max_attempts times is marked
+    dead (dead_at is set) and kept with its last error but no longer retried,
+    so one bad payload cannot hold up the entries queued after it.
+    """
+
+    def __init__(self, database, path: str = None, batch_size: int = 20,
+                 base_delay: float = 1.0, max_delay: float = 300.0,
+                 poll_interval: float = 5.0, max_attempts: int = None):
+        """Open the outbox file; call start() to begin draining
+
+        max_attempts defaults to OUTBOX_MAX_ATTEMPTS.
+        """
+        if max_attempts is None:
+            max_attempts = int(os.getenv("OUTBOX_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS))
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+
+        self.database = database
+        self.path = path or os.getenv("OUTBOX_PATH", DEFAULT_OUTBOX_PATH)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.executescript(OUTBOX_SCHEMA)
+            # Outbox files created before dead-lettering lack the column
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(outbox)")}
+            if "dead_at" not in columns:
+                self.conn.execute("ALTER TABLE outbox ADD COLUMN dead_at REAL")
+
+    def enqueue_screening(self, title: str, description: str, screenings: List[Dict],
+                          company: str = None) -> str:
+        """Queue a screening run for saving and return its job id
+
+        Each screening holds the resume (filename, content, email, phone)
+        and the keyword arguments of save_screening_result other than the
+        job and resume ids. The job id is derived from the description, so
+        every run of the same job description shares one job row.
+        """
+        job_id = job_description_id(description)
+        # created_at is part of the partitioned table's primary key, so it
+        # is fixed here along with the ids for retries to be idempotent
+        created_at = utc_timestamp()
+        payload = {
+            "job": {"job_id": job_id, "title": title, "description": description, "company": company},
+            "screenings": [
+                dict(screening, result_id=str(uuid.uuid4()), created_at=created_at)
+                for screening in screenings
+            ]
+        }
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO outbox (payload, next_attempt_at, created_at) VALUES (?, ?, ?)",
+                (json.dumps(payload, default=str), now, now)
+            )
+        self._wakeup.set()
+        return job_id
+
+    def pending_count(self) -> int:
+        """Number of screening runs not yet saved that are still being retried"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE dead_at IS NULL").fetchone()[0]
+
+    def dead_letter_count(self) -> int:
+        """Number of screening runs that gave up after max_attempts failures"""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE dead_at IS NOT NULL").fetchone()[0]
+
+    def _write(self, payload: Dict):
+        """Save one screening run, raising OutboxWriteError on any failed write"""
+        job = payload["job"]
+        job_id = self.database.save_job_description(**job)
+        if not job_id:
+            raise OutboxWriteError("job description was not saved")
+
+        rows = []
+        for screening in payload["screenings"]:
+            screening = dict(screening)
+            resume_id = self.database.save_resume(
+                filename=screening.pop("filename"),
+                content=screening.pop("content"),
+                email=screening.pop("email", None),
+                phone=screening.pop("phone", None)
+            )
+            if not resume_id:
+                raise OutboxWriteError("resume was not saved")
+            rows.append(dict(screening, job_id=job_id, resume_id=resume_id))
+
+        if rows and None in self.database.save_screening_results(rows):
+            raise OutboxWriteError("screening results were not saved")
+
+    def _backoff(self, attempts: int) -> float:
+        """Exponential backoff with jitter, capped at max_delay"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def drain(self) -> int:
+        """Write one batch of due entries; returns how many were saved"""
+        with self._lock:
+            entries = self.conn.execute(
+                "SELECT id, payload, attempts FROM outbox "
+                "WHERE dead_at IS NULL AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (time.time(), self.batch_size)
+            ).fetchall()
+
+        saved = 0
+        for entry in entries:
+            try:
+                self._write(json.loads(entry["payload"]))
+            except Exception as e:
+                attempts = entry["attempts"] + 1
+                dead_at = time.time() if attempts >= self.max_attempts else None
+                if dead_at:
+                    print(f"Warning: Saving screening failed {attempts} times, giving up: {e}")
+                else:
+                    print(f"Warning: Saving screening (attempt {attempts}) failed, will retry: {e}")
+                with self._lock, self.conn:
+                    self.conn.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?, dead_at = ? "
+                        "WHERE id = ?",
+                        (attempts, time.time() + self._backoff(attempts), str(e), dead_at, entry["id"])
+                    )
+                # The database is likely unavailable; leave the rest for later
+                break
+
+            with self._lock, self.conn:
+                self.conn.execute("DELETE FROM outbox WHERE id = ?", (entry["id"],))
+            saved += 1
+
+        return saved
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Drain due entries in the calling thread; True when nothing is left to retry"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.drain():
+                break
+        return self.pending_count() == 0
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                saved = self.drain()
+            except Exception as e:
+                print(f"Warning: Outbox worker error: {e}")
+                saved = 0
+            if saved < self.batch_size:
+                # Nothing more due right now: sleep until the next retry is
+                # due, an entry is enqueued or the poll interval passes
+                with self._lock:
+                    next_due = self.conn.execute(
+                        "SELECT MIN(next_attempt_at) FROM outbox WHERE dead_at IS NULL"
+                    ).fetchone()[0]
+                timeout = self.poll_interval
+                if next_due is not None:
+                    timeout = min(timeout, max(0.0, next_due - time.time()))
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+
+    def start(self):
+        """Start the background worker if it is not running"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="screening-outbox", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the background worker; queued entries stay in the outbox"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+
+_outbox: Optional[ScreeningOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox(database=None) -> ScreeningOutbox:
+    """Get the process-wide outbox, starting its worker on first use"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = ScreeningOutbox(database or get_database())
+            _outbox.start()
+        return _outbox
@@ -4,37 +4,279 @@ PDF and DOCX parsing utilities
 import PyPDF2
 import pdfplumber
 from docx import Document
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 import io
+import re
+import time
+import zipfile
+import hashlib
+import posixpath
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Quality thresholds for accepting the fast PyPDF2 text of a page
+MIN_PAGE_CHARS = 200
+MAX_GARBAGE_RATIO = 0.05
+MAX_SHORT_LINE_RATIO = 0.6
+MAX_LONG_WORD_RATIO = 0.1
+
+# Default limits for a single resume; larger documents are truncated or flagged
+MAX_RESUME_PAGES = 30
+MAX_RESUME_CHARS = 100_000
+MAX_RESUME_BYTES = 10 * 1024 * 1024
+
+# Limits for bulk ZIP ingestion, guarding against zip bombs
+MAX_ARCHIVE_MEMBERS = 1000
+MAX_ARCHIVE_TOTAL_BYTES = 500 * 1024 * 1024
+MAX_COMPRESSION_RATIO = 100
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+GARBAGE_PATTERN = re.compile(r'\(cid:\d+\)|[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def score_page_text(text: str) -> Dict:
+    """Score extracted page text and decide if it is good enough to keep
+    
+    Low character counts suggest a scanned or image-heavy page, garbage
+    characters suggest broken font encodings, and many very short lines or
+    run-together words suggest interleaved multi-column text.
+    """
+    text = text or ""
+    chars = len(text.strip())
+    garbage_ratio = len(GARBAGE_PATTERN.findall(text)) / chars if chars else 0.0
+    
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    short_line_ratio = sum(1 for line in lines if len(line) < 15) / len(lines) if len(lines) >= 10 else 0.0
+    
+    words = text.split()
+    long_word_ratio = sum(1 for word in words if len(word) > 20) / len(words) if words else 0.0
+    
+    ok = (
+        chars >= MIN_PAGE_CHARS
+        and garbage_ratio <= MAX_GARBAGE_RATIO
+        and short_line_ratio <= MAX_SHORT_LINE_RATIO
+        and long_word_ratio <= MAX_LONG_WORD_RATIO
+    )
+    
+    return {
+        'chars': chars,
+        'garbage_ratio': round(garbage_ratio, 3),
+        'short_line_ratio': round(short_line_ratio, 3),
+        'long_word_ratio': round(long_word_ratio, 3),
+        'ok': ok
+    }
+
+
+def iter_pdf_pages(file_content: bytes, max_pages: Optional[int] = None) -> Iterator[Dict]:
+    """Extract PDF text page by page with a tiered strategy
+    
+    Every page first goes through fast PyPDF2 text-stream extraction. Only
+    pages whose output fails score_page_text are re-extracted with
+    pdfplumber's slower layout analysis. Pages are yielded one at a time and
+    each record carries the engine used, the time spent on it and the total
+    page count of the document. At most max_pages pages are extracted.
+    """
+    plumber_pdf = None
+    try:
+        fast_pages = PyPDF2.PdfReader(io.BytesIO(file_content)).pages
+        page_count = len(fast_pages)
+    except Exception as e:
+        # PyPDF2 cannot read the file at all; let pdfplumber handle every page
+        fast_pages = None
+        try:
+            plumber_pdf = pdfplumber.open(io.BytesIO(file_content))
+            page_count = len(plumber_pdf.pages)
+        except Exception:
+            raise Exception(f"Failed to parse PDF: {str(e)}")
+    
+    try:
+        for index in range(min(page_count, max_pages) if max_pages else page_count):
+            started = time.perf_counter()
+            text = ""
+            quality = None
+            
+            if fast_pages is not None:
+                try:
+                    text = fast_pages[index].extract_text() or ""
+                except Exception:
+                    text = ""
+                quality = score_page_text(text)
+                if quality['ok']:
+                    yield {
+                        'page': index + 1,
+                        'page_count': page_count,
+                        'text': text,
+                        'engine': 'pypdf2',
+                        'seconds': time.perf_counter() - started,
+                        'quality': quality
+                    }
+                    continue
+            
+            # Escalate this page to the layout engine
+            engine = 'pypdf2' if fast_pages is not None else 'pdfplumber'
+            try:
+                if plumber_pdf is None:
+                    plumber_pdf = pdfplumber.open(io.BytesIO(file_content))
+                layout_text = plumber_pdf.pages[index].extract_text() or ""
+                if layout_text.strip():
+                    text = layout_text
+                    engine = 'pdfplumber'
+                    quality = score_page_text(text)
+            except Exception:
+                # Keep whatever the fast path produced for this page
+                pass
+            
+            yield {
+                'page': index + 1,
+                'page_count': page_count,
+                'text': text,
+                'engine': engine,
+                'seconds': time.perf_counter() - started,
+                'quality': quality or score_page_text(text)
+            }
+    finally:
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+
+
+def extract_pdf_pages(file_content: bytes, max_pages: Optional[int] = None) -> List[Dict]:
+    """Extract all PDF pages with their engine and timing report"""
+    return list(iter_pdf_pages(file_content, max_pages=max_pages))
 
 
 def parse_pdf(file_content: bytes) -> str:
     """Parse PDF file and extract text"""
-    text = ""
+    pages = iter_pdf_pages(file_content)
+    return "\n".join(page['text'] for page in pages if page['text']).strip()
+
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+HEADER_PART_PATTERN = re.compile(r'word/header(\d*)\.xml$')
+FOOTER_PART_PATTERN = re.compile(r'word/footer(\d*)\.xml$')
+
+# Inline elements that stand for characters in a run
+DOCX_INLINE_TEXT = {
+    WORD_NS + 'tab': '\t',
+    WORD_NS + 'br': '\n',
+    WORD_NS + 'cr': '\n',
+    WORD_NS + 'noBreakHyphen': '-',
+}
+
+
+def _iter_docx_part(stream) -> Iterator[str]:
+    """Stream paragraph and table-row texts out of one WordprocessingML part
+    
+    Paragraphs nested in text boxes are emitted on their own, table cells
+    are joined with " | " per row, and the VML fallback copy of text boxes
+    (mc:Fallback) is skipped so their text is not emitted twice.
+    """
+    paragraph_stack = []
+    cell_stack = []
+    row_stack = []
+    fallback_depth = 0
+    
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+        
+        if tag == MC_FALLBACK:
+            fallback_depth += 1 if event == 'start' else -1
+            if event == 'end':
+                elem.clear()
+            continue
+        if fallback_depth:
+            continue
+        
+        if event == 'start':
+            if tag == WORD_NS + 'p':
+                paragraph_stack.append([])
+            elif tag == WORD_NS + 'tc':
+                cell_stack.append([])
+            elif tag == WORD_NS + 'tr':
+                row_stack.append([])
+            continue
+        
+        if tag == WORD_NS + 't':
+            if paragraph_stack:
+                paragraph_stack[-1].append(elem.text or '')
+        elif tag in DOCX_INLINE_TEXT:
+            if paragraph_stack:
+                paragraph_stack[-1].append(DOCX_INLINE_TEXT[tag])
+        elif tag == WORD_NS + 'p':
+            text = ''.join(paragraph_stack.pop())
+            if cell_stack:
+                cell_stack[-1].append(text)
+            else:
+                yield text
+            elem.clear()
+        elif tag == WORD_NS + 'tc':
+            cell_text = '\n'.join(text for text in cell_stack.pop() if text)
+            if row_stack:
+                row_stack[-1].append(cell_text)
+        elif tag == WORD_NS + 'tr':
+            row_text = ' | '.join(cell for cell in row_stack.pop() if cell)
+            if cell_stack:
+                # Row of a table nested inside another table's cell
+                cell_stack[-1].append(row_text)
+            elif row_text:
+                yield row_text
+            elem.clear()
+
+
+def iter_docx_paragraphs(file_content: bytes) -> Iterator[str]:
+    """Yield DOCX text blocks one at a time in reading order
     
-    # Try pdfplumber first (better for complex PDFs)
+    The XML parts are streamed out of the zip with an incremental parser
+    instead of loading the document model, so memory stays bounded. Header
+    text comes first, then the body (paragraphs and table rows), then
+    footers; header/footer lines repeated across parts are emitted once.
+    """
     try:
-        pdf_file = io.BytesIO(file_content)
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        docx_zip = zipfile.ZipFile(io.BytesIO(file_content))
+        part_names = docx_zip.namelist()
+        if 'word/document.xml' not in part_names:
+            raise ValueError("word/document.xml not found")
     except Exception as e:
-        # Fallback to PyPDF2
-        try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        except Exception as e2:
-            raise Exception(f"Failed to parse PDF: {str(e2)}")
+        raise Exception(f"Failed to parse DOCX: {str(e)}")
+    
+    def numbered_parts(pattern):
+        names = [name for name in part_names if pattern.match(name)]
+        return sorted(names, key=lambda name: int(pattern.match(name).group(1) or 0))
     
-    return text.strip()
+    with docx_zip:
+        seen_margin_text = set()
+        parts = (
+            [(name, True) for name in numbered_parts(HEADER_PART_PATTERN)]
+            + [('word/document.xml', False)]
+            + [(name, True) for name in numbered_parts(FOOTER_PART_PATTERN)]
+        )
+        for part_name, is_margin in parts:
+            try:
+                with docx_zip.open(part_name) as stream:
+                    for text in _iter_docx_part(stream):
+                        if is_margin:
+                            if not text or text in seen_margin_text:
+                                continue
+                            seen_margin_text.add(text)
+                        yield text
+            except ET.ParseError as e:
+                raise Exception(f"Failed to parse DOCX: {str(e)}")
 
 
 def parse_docx(file_content: bytes) -> str:
     """Parse DOCX file and extract text"""
+    return "\n".join(iter_docx_paragraphs(file_content)).strip()
+
+
+def parse_docx_dom(file_content: bytes) -> str:
+    """Parse DOCX body paragraphs through the python-docx document model
+    
+    This was the original DOCX path; it is kept for benchmarking against
+    the streaming reader.
+    """
     try:
         doc_file = io.BytesIO(file_content)
         doc = Document(doc_file)
@@ -44,69 +286,318 @@ def parse_docx(file_content: bytes) -> str:
         raise Exception(f"Failed to parse DOCX: {str(e)}")
 
 
-def parse_resume(file_content: bytes, filename: str) -> str:
-    """Parse resume file based on extension"""
+def parse_resume_document(file_content: bytes, filename: str,
+                          max_pages: Optional[int] = MAX_RESUME_PAGES,
+                          max_chars: Optional[int] = MAX_RESUME_CHARS,
+                          max_bytes: Optional[int] = MAX_RESUME_BYTES) -> Dict:
+    """Parse a resume file within page, character and byte limits
+    
+    Text is streamed page by page (PDF) or paragraph by paragraph (DOCX) and
+    extraction stops as soon as a limit is reached. The result reports
+    whether the document was truncated and why; files over max_bytes are
+    flagged with reason "max_bytes" and not parsed at all.
+    """
     filename_lower = filename.lower()
+    document = {
+        'text': '',
+        'pages': [],
+        'truncated': False,
+        'truncation_reason': None
+    }
     
     if filename_lower.endswith('.pdf'):
-        return parse_pdf(file_content)
+        blocks = iter_pdf_pages(file_content, max_pages=max_pages)
     elif filename_lower.endswith('.docx') or filename_lower.endswith('.doc'):
-        return parse_docx(file_content)
+        blocks = ({'text': text} for text in iter_docx_paragraphs(file_content))
     else:
         raise ValueError(f"Unsupported file format: {filename}. Supported: PDF, DOCX")
+    
+    if max_bytes and len(file_content) > max_bytes:
+        document['truncated'] = True
+        document['truncation_reason'] = 'max_bytes'
+        return document
+    
+    parts = []
+    total_chars = 0
+    for block in blocks:
+        text = block.pop('text')
+        if 'page' in block:
+            document['pages'].append(block)
+            if max_pages and block['page'] == max_pages and block['page_count'] > max_pages:
+                document['truncated'] = True
+                document['truncation_reason'] = 'max_pages'
+        
+        if max_chars and total_chars + len(text) > max_chars:
+            # The joining newlines can already have used up the budget, and
+            # a negative slice would keep all but the end of the block
+            remaining = max_chars - total_chars
+            if remaining > 0:
+                parts.append(text[:remaining])
+            document['truncated'] = True
+            document['truncation_reason'] = 'max_chars'
+            blocks.close()
+            break
+        
+        # +1 for the newline the parts are joined with
+        parts.append(text)
+        total_chars += len(text) + 1
+    
+    document['text'] = "\n".join(part for part in parts if part).strip()
+    return document
 
 
-def extract_resume_sections(text: str) -> dict:
-    """Extract structured sections from resume text"""
-    sections = {
+def parse_resume(file_content: bytes, filename: str,
+                 max_pages: Optional[int] = MAX_RESUME_PAGES,
+                 max_chars: Optional[int] = MAX_RESUME_CHARS,
+                 max_bytes: Optional[int] = MAX_RESUME_BYTES) -> str:
+    """Parse resume file based on extension"""
+    document = parse_resume_document(
+        file_content, filename,
+        max_pages=max_pages, max_chars=max_chars, max_bytes=max_bytes
+    )
+    if document['truncation_reason'] == 'max_bytes':
+        raise ValueError(f"File too large: {filename} is over {max_bytes // (1024 * 1024)} MB")
+    return document['text']
+
+
+def _read_archive_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, limit: int) -> Optional[bytes]:
+    """Read one archive member, or return None if it decompresses past limit
+    
+    The declared size in the zip header can be forged, so the limit is
+    enforced on the bytes actually decompressed.
+    """
+    chunks = []
+    size = 0
+    with archive.open(info) as member:
+        while True:
+            chunk = member.read(64 * 1024)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                return None
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def iter_zip_resumes(archive_file, workers: int = 1,
+                     max_members: int = MAX_ARCHIVE_MEMBERS,
+                     max_member_bytes: int = MAX_RESUME_BYTES,
+                     max_total_bytes: int = MAX_ARCHIVE_TOTAL_BYTES,
+                     **parse_limits) -> Iterator[Dict]:
+    """Parse the resumes inside a ZIP archive one member at a time
+    
+    archive_file is a path or a binary file object. Members are decompressed
+    one by one and handed to parse_resume_document, optionally on `workers`
+    threads with only a bounded number of members in flight, so memory does
+    not grow with the archive size. Each yielded record has filename,
+    sha256, status ("parsed", "duplicate", "skipped" or "error"), reason
+    and, for parsed members, the document. Duplicate files (same content
+    hash) are skipped, as are members that exceed the size, compression
+    ratio or count limits.
+    """
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except Exception as e:
+        raise Exception(f"Failed to read ZIP archive: {str(e)}")
+    
+    def parse_member(filename, file_content):
+        try:
+            return parse_resume_document(
+                file_content, filename, max_bytes=max_member_bytes, **parse_limits
+            ), None
+        except Exception as e:
+            return None, str(e)
+    
+    def finish(record, parsed):
+        document, error = parsed
+        if error:
+            record.update(status='error', reason=error)
+        else:
+            record.update(status='parsed', document=document)
+        return record
+    
+    seen_hashes = set()
+    total_bytes = 0
+    members = 0
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    
+    # Records in archive order; parsed members carry a future until done
+    pending = deque()
+    
+    def ready():
+        while pending:
+            record, future = pending[0]
+            if future is not None and not future.done() and len(pending) < workers * 2:
+                return
+            pending.popleft()
+            yield finish(record, future.result()) if future is not None else record
+    
+    try:
+        with archive:
+            for info in archive.infolist():
+                filename = info.filename
+                basename = posixpath.basename(filename)
+                if info.is_dir() or filename.startswith('__MACOSX/') or basename.startswith('.'):
+                    continue
+                
+                record = {'filename': basename, 'sha256': None, 'status': 'skipped', 'reason': None}
+                pending.append((record, None))
+                
+                if not basename.lower().endswith(RESUME_EXTENSIONS):
+                    record['reason'] = 'unsupported_format'
+                    yield from ready()
+                    continue
+                
+                members += 1
+                if members > max_members:
+                    record['reason'] = 'max_members'
+                    break
+                
+                if info.flag_bits & 0x1:
+                    record['reason'] = 'encrypted'
+                elif info.file_size > max_member_bytes:
+                    record['reason'] = 'max_bytes'
+                elif info.compress_size and info.file_size / info.compress_size > MAX_COMPRESSION_RATIO:
+                    record['reason'] = 'compression_ratio'
+                if record['reason']:
+                    yield from ready()
+                    continue
+                
+                file_content = _read_archive_member(archive, info, max_member_bytes)
+                if file_content is None:
+                    record['reason'] = 'max_bytes'
+                    yield from ready()
+                    continue
+                
+                total_bytes += len(file_content)
+                if total_bytes > max_total_bytes:
+                    record['reason'] = 'max_total_bytes'
+                    break
+                
+                record['sha256'] = hashlib.sha256(file_content).hexdigest()
+                if record['sha256'] in seen_hashes:
+                    record['status'] = 'duplicate'
+                    yield from ready()
+                    continue
+                seen_hashes.add(record['sha256'])
+                
+                if executor is None:
+                    finish(record, parse_member(basename, file_content))
+                else:
+                    pending[-1] = (record, executor.submit(parse_member, basename, file_content))
+                del file_content
+                yield from ready()
+            
+            # Wait for the members still being parsed
+            while pending:
+                record, future = pending.popleft()
+                yield finish(record, future.result()) if future is not None else record
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+# Look for common section headers
+SECTION_KEYWORDS = {
+    'summary': ['summary', 'objective', 'profile', 'about'],
+    'experience': ['experience', 'employment', 'work history', 'professional experience'],
+    'education': ['education', 'academic', 'qualifications'],
+    'skills': ['skills', 'technical skills', 'competencies']
+}
+KEYWORD_SECTION = {
+    keyword: section
+    for section, keywords in SECTION_KEYWORDS.items()
+    for keyword in keywords
+}
+# A header line is mostly its keyword: optional bullets or numbering, at
+# most two qualifying words ("Work Experience", "Core Skills"), the keyword
+# and trailing punctuation. Lines that merely mention a keyword, such as
+# "Mentored juniors on testing skills", do not start a section
+SECTION_HEADER_PATTERN = re.compile(
+    r'[\W\d_]*(?:[^\W\d_]+[ \t]+){0,2}?(?P<keyword>'
+    + '|'.join(re.escape(keyword) for keyword in sorted(KEYWORD_SECTION, key=len, reverse=True))
+    + r')[^\w\n]*',
+    re.IGNORECASE
+)
+MAX_HEADER_LENGTH = 50
+
+
+def segment_resume(text: str) -> Dict:
+    """Segment resume text into sections in a single pass over its lines
+    
+    A short line (under MAX_HEADER_LENGTH characters) that consists of a
+    header keyword, optionally qualified by a word or two, starts a section,
+    which runs until the next header. Sections are returned as lists of
+    [start, end] character offsets into text rather than copied strings; use
+    section_text to materialize one.
+    """
+    segments = {
         'name': '',
         'email': '',
         'phone': '',
-        'summary': '',
-        'experience': '',
-        'education': '',
-        'skills': '',
-        'full_text': text
+        'spans': {section: [] for section in SECTION_KEYWORDS}
     }
     
-    # Extract email
-    import re
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    if emails:
-        sections['email'] = emails[0]
-    
-    # Extract phone
-    phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    phones = re.findall(phone_pattern, text)
-    if phones:
-        sections['phone'] = phones[0] if isinstance(phones[0], str) else ''.join(phones[0])
-    
-    # Try to identify sections (basic approach)
-    text_lower = text.lower()
-    lines = text.split('\n')
-    
-    # Look for common section headers
-    section_keywords = {
-        'summary': ['summary', 'objective', 'profile', 'about'],
-        'experience': ['experience', 'employment', 'work history', 'professional experience'],
-        'education': ['education', 'academic', 'qualifications'],
-        'skills': ['skills', 'technical skills', 'competencies']
-    }
+    email = EMAIL_PATTERN.search(text)
+    if email:
+        segments['email'] = email.group(0)
+    
+    phone = PHONE_PATTERN.search(text)
+    if phone:
+        segments['phone'] = phone.group(0).strip()
     
     current_section = None
-    for i, line in enumerate(lines):
-        line_lower = line.lower().strip()
-        for section, keywords in section_keywords.items():
-            if any(keyword in line_lower for keyword in keywords) and len(line) < 50:
-                current_section = section
-                break
+    position = 0
+    text_length = len(text)
+    while position <= text_length:
+        line_end = text.find('\n', position)
+        if line_end == -1:
+            line_end = text_length
         
-        if current_section and current_section in sections:
-            if sections[current_section]:
-                sections[current_section] += '\n' + line
+        if line_end - position < MAX_HEADER_LENGTH:
+            match = SECTION_HEADER_PATTERN.fullmatch(text, position, line_end)
+            if match:
+                # IGNORECASE also matches case-fold variants such as "ſkills",
+                # which only map back to a keyword after casefold()
+                current_section = KEYWORD_SECTION.get(match.group('keyword').casefold(), current_section)
+        
+        if current_section:
+            spans = segments['spans'][current_section]
+            if spans and spans[-1][1] == position - 1:
+                # Extend the span over a directly following line
+                spans[-1][1] = line_end
             else:
-                sections[current_section] = line
+                spans.append([position, line_end])
+        
+        position = line_end + 1
     
-    return sections
+    return segments
 
+
+def segment_resumes(texts: List[str]) -> List[Dict]:
+    """Segment a batch of resume texts"""
+    return [segment_resume(text) for text in texts]
+
+
+def section_text(text: str, spans: List[List[int]]) -> str:
+    """Materialize a section from its offsets"""
+    return '\n'.join(text[start:end] for start, end in spans)
+
+
+def extract_resume_sections(text: str) -> dict:
+    """Extract structured sections from resume text"""
+    segments = segment_resume(text)
+    sections = {
+        'name': segments['name'],
+        'email': segments['email'],
+        'phone': segments['phone'],
+        'full_text': text
+    }
+    for section, spans in segments['spans'].items():
+        sections[section] = section_text(text, spans)
+    
+    return sections
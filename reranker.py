@@ -0,0 +1,72 @@
+"""
+Cross-encoder reranking for the top of the vector shortlist
+"""
+from typing import Callable, List
+from sentence_transformers import CrossEncoder
+
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Loaded cross-encoders, shared by every reranker in the process
+_models = {}
+
+
+def fit_rerank_calibration(similarities: List[float], scores: List[float]) -> Callable[[float], float]:
+    """Estimate cross-encoder scores from cosine similarity, fitted on the shortlist
+
+    A least-squares line through the reranked (similarity, score) pairs maps
+    the similarity of a resume outside the shortlist to an estimated score,
+    so every resume in a batch is fused on the same scale. Estimates are
+    clipped to [0, lowest shortlist score]: a resume that ranked below the
+    shortlist on similarity is never estimated above a reranked one.
+    """
+    count = len(scores)
+    if not count:
+        return lambda similarity: 0.0
+
+    mean_similarity = sum(similarities) / count
+    mean_score = sum(scores) / count
+    variance = sum((similarity - mean_similarity) ** 2 for similarity in similarities)
+    slope = 0.0
+    if variance > 0:
+        covariance = sum((similarity - mean_similarity) * (score - mean_score)
+                         for similarity, score in zip(similarities, scores))
+        slope = covariance / variance
+    intercept = mean_score - slope * mean_similarity
+    ceiling = min(scores)
+
+    return lambda similarity: min(ceiling, max(0.0, slope * similarity + intercept))
+
+
+class CrossEncoderReranker:
+    """Local cross-encoder that scores (job description, resume) pairs on CPU"""
+
+    def __init__(self, model_name: str = DEFAULT_RERANK_MODEL, batch_size: int = 16,
+                 max_chars: int = 4000):
+        """Initialize the reranker; the model is loaded on first use"""
+        self.model_name = model_name
+        self.batch_size = batch_size
+        # The model only sees its first 512 tokens, so longer texts are cut early
+        self.max_chars = max_chars
+
+    def _get_model(self) -> CrossEncoder:
+        """Load the cross-encoder once per process"""
+        if self.model_name not in _models:
+            _models[self.model_name] = CrossEncoder(self.model_name, max_length=512, device="cpu")
+        return _models[self.model_name]
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        """Score documents against the query, calibrated to the 0-1 range"""
+        if not documents:
+            return []
+
+        pairs = [(query[:self.max_chars], document[:self.max_chars]) for document in documents]
+        # Single-label cross-encoders apply a sigmoid to their relevance
+        # logit, giving a probability-like score that can be mixed with
+        # cosine similarity
+        scores = self._get_model().predict(
+            pairs,
+            batch_size=self.batch_size,
+            show_progress_bar=False
+        )
+        return [float(score) for score in scores]
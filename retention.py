@@ -0,0 +1,104 @@
+"""
+Retention job that archives old screening results to compressed files and removes them
+"""
+import os
+import gzip
+import json
+import contextlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+try:
+    from .database import get_database
+    from .utils import utc_timestamp
+except ImportError:
+    from src.database import get_database
+    from src.utils import utc_timestamp
+
+
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_ARCHIVE_DIR = "./archive"
+
+
+class RetentionPolicy:
+    """Keep retention_days of screening results in the database
+
+    Older rows are streamed to a gzip-compressed JSON Lines file before
+    anything is removed, and nothing is removed if the archive could not be
+    written. On Supabase whole monthly partitions are dropped, so the cutoff
+    is rounded down to the start of its month; on SQLite rows are deleted.
+    """
+
+    def __init__(self, database, retention_days: int = None, archive_dir: str = None,
+                 batch_size: int = 500, months_ahead: int = 3):
+        """Configure the policy; defaults come from RETENTION_DAYS and ARCHIVE_DIR"""
+        if retention_days is None:
+            retention_days = int(os.getenv("RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+        if retention_days < 1:
+            raise ValueError(f"retention_days must be at least 1, got {retention_days}")
+
+        self.database = database
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir or os.getenv("ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR)
+        self.batch_size = batch_size
+        self.months_ahead = months_ahead
+
+    def cutoff(self, now: datetime = None) -> str:
+        """Timestamp before which rows are archived and removed"""
+        now = now or datetime.now(timezone.utc)
+        return self.database.retention_boundary(utc_timestamp(now - timedelta(days=self.retention_days)))
+
+    def archive(self, before: str) -> Tuple[Optional[str], int]:
+        """Write the rows created before a timestamp to a new .jsonl.gz file
+
+        Returns the file path (None when there was nothing to archive) and
+        the row count. The file is written under a temporary name and only
+        renamed once complete.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        started = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(self.archive_dir, f"screening_results_before_{before[:10]}_{started}.jsonl.gz")
+        partial_path = path + ".partial"
+
+        count = 0
+        try:
+            with gzip.open(partial_path, 'wt', encoding='utf-8') as f:
+                for row in self.database.iter_screening_results_before(before, self.batch_size):
+                    f.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+                    count += 1
+        except Exception:
+            # The file may not exist if opening it was what failed
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(partial_path)
+            raise
+
+        if not count:
+            os.remove(partial_path)
+            return None, 0
+        os.replace(partial_path, path)
+        return path, count
+
+    def run(self, now: datetime = None) -> Dict:
+        """Create upcoming partitions, then archive and remove expired rows"""
+        partitions_ready = self.database.ensure_partitions(self.months_ahead)
+        before = self.cutoff(now)
+        archive_path, archived = self.archive(before)
+        purged = self.database.purge_screening_results(before) if archived else 0
+        return {
+            "backend": self.database.backend,
+            "partitions_ready": partitions_ready,
+            "cutoff": before,
+            "archived": archived,
+            "archive_path": archive_path,
+            "purged": purged
+        }
+
+
+def run_retention(database=None, **kwargs) -> Dict:
+    """Apply the retention policy once, e.g. from a daily cron job"""
+    return RetentionPolicy(database or get_database(), **kwargs).run()
+
+
+if __name__ == "__main__":
+    # python -m src.retention
+    print(json.dumps(run_retention(), indent=2))
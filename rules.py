@@ -0,0 +1,172 @@
+"""
+Hard-requirement prefilter evaluated across a batch of resumes
+"""
+import re
+from typing import Dict, List, Optional
+import numpy as np
+
+try:
+    from .parsers import segment_resume, section_text
+    from .skills import get_skill_matcher
+    from .utils import extract_skills_batch, calculate_experience_years
+except ImportError:
+    from src.parsers import segment_resume, section_text
+    from src.skills import get_skill_matcher
+    from src.utils import extract_skills_batch, calculate_experience_years
+
+
+DEGREE_LEVELS = {'bachelor': 1, 'master': 2, 'phd': 3}
+
+# Checked from the highest level down; the first match sets the level
+DEGREE_PATTERNS = [
+    ('phd', re.compile(r"\b(?:ph\.?\s?d\.?|doctorate|doctor of philosophy)(?!\w)", re.IGNORECASE)),
+    ('master', re.compile(r"\b(?:master'?s?|m\.s\.|m\.?sc\.?|mba|m\.?eng\.?|m\.?tech)(?!\w)", re.IGNORECASE)),
+    ('bachelor', re.compile(r"\b(?:bachelor'?s?|b\.s\.|b\.?sc\.?|b\.a\.|b\.?eng\.?|b\.?tech|undergraduate degree)(?!\w)", re.IGNORECASE)),
+]
+
+REQUIREMENT_ACTIONS = ('reject', 'flag')
+
+
+def detect_degree_level(text: str) -> int:
+    """Return the highest degree level mentioned in text (0 when none)"""
+    for degree, pattern in DEGREE_PATTERNS:
+        if pattern.search(text):
+            return DEGREE_LEVELS[degree]
+    return 0
+
+
+def extract_resume_features(texts: List[str]) -> List[Dict]:
+    """Compute the features the prefilter needs for a batch of raw resume texts
+
+    Degrees are looked for in the education section and employment dates
+    in the experience section when the resume has one, otherwise in the
+    whole text.
+    """
+    skills = extract_skills_batch(texts)
+    features = []
+    for text, resume_skills in zip(texts, skills):
+        spans = segment_resume(text)['spans']
+        education_spans = spans['education']
+        education_text = section_text(text, education_spans) if education_spans else text
+        features.append({
+            'skills': resume_skills,
+            'experience_years': calculate_experience_years(text, spans['experience'] or None),
+            'degree_level': detect_degree_level(education_text)
+        })
+    return features
+
+
+class HardRequirements:
+    """Knock-out criteria configured per job"""
+
+    def __init__(self, min_years: Optional[float] = None,
+                 mandatory_skills: Optional[List[str]] = None,
+                 min_degree: Optional[str] = None, action: str = 'reject'):
+        """Initialize requirements
+
+        action "reject" removes non-qualifying resumes before any embedding
+        or LLM work; "flag" screens them anyway and records the reasons.
+        """
+        if min_degree and min_degree.lower() not in DEGREE_LEVELS:
+            raise ValueError(f"Unsupported degree: {min_degree}. Supported: {', '.join(DEGREE_LEVELS)}")
+        if action not in REQUIREMENT_ACTIONS:
+            raise ValueError(f"Unsupported action: {action}. Supported: {', '.join(REQUIREMENT_ACTIONS)}")
+
+        self.min_years = min_years
+        self.min_degree = min_degree.lower() if min_degree else None
+        self.action = action
+
+        # Map "k8s" and "kubernetes" to the taxonomy's canonical "Kubernetes".
+        # Skills outside the taxonomy (e.g. "SAP") never appear in the
+        # extracted features, so they are searched for in the resume text
+        matcher = get_skill_matcher()
+        self.mandatory_skills = []
+        self.text_skill_patterns = {}
+        for skill in mandatory_skills or []:
+            canonical = matcher.lookup(skill) or next(iter(matcher.extract(skill)), None)
+            name = canonical or skill.strip()
+            if name and name not in self.mandatory_skills:
+                self.mandatory_skills.append(name)
+                if not canonical:
+                    self.text_skill_patterns[name] = re.compile(
+                        r"(?<!\w)" + r"\s+".join(re.escape(word) for word in name.split()) + r"(?!\w)",
+                        re.IGNORECASE
+                    )
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> 'HardRequirements':
+        """Build requirements from a stored job configuration"""
+        return cls(
+            min_years=config.get('min_years'),
+            mandatory_skills=config.get('mandatory_skills'),
+            min_degree=config.get('min_degree'),
+            action=config.get('action', 'reject')
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'min_years': self.min_years,
+            'mandatory_skills': self.mandatory_skills,
+            'min_degree': self.min_degree,
+            'action': self.action
+        }
+
+    def is_empty(self) -> bool:
+        return not (self.min_years or self.mandatory_skills or self.min_degree)
+
+    def evaluate(self, features: List[Dict], texts: Optional[List[str]] = None) -> List[Dict]:
+        """Evaluate every resume at once with NumPy boolean operations
+
+        texts are the raw resume texts, required when a mandatory skill is
+        not in the taxonomy. Returns one outcome per resume: passed, the
+        action to take when it did not pass, and human-readable reasons.
+        """
+        if self.text_skill_patterns and texts is None:
+            raise ValueError("Resume texts are required to check skills outside the taxonomy: "
+                             + ", ".join(self.text_skill_patterns))
+        count = len(features)
+        passed = np.ones(count, dtype=bool)
+        reasons = [[] for _ in range(count)]
+
+        if self.min_years:
+            years = np.fromiter((f['experience_years'] for f in features), dtype=float, count=count)
+            failed = years < self.min_years
+            passed &= ~failed
+            for i in np.nonzero(failed)[0]:
+                reasons[i].append(f"{years[i]:.1f} years of experience, {self.min_years:g} required")
+
+        if self.mandatory_skills:
+            # has_skill[i, j]: resume i mentions mandatory skill j
+            lowered = [{skill.lower() for skill in f['skills']} for f in features]
+            has_skill = np.array(
+                [
+                    [
+                        self.text_skill_patterns[skill].search(texts[i]) is not None
+                        if skill in self.text_skill_patterns else skill.lower() in resume_skills
+                        for skill in self.mandatory_skills
+                    ]
+                    for i, resume_skills in enumerate(lowered)
+                ],
+                dtype=bool
+            ).reshape(count, len(self.mandatory_skills))
+            failed = ~has_skill.all(axis=1)
+            passed &= ~failed
+            for i in np.nonzero(failed)[0]:
+                missing = [self.mandatory_skills[j] for j in np.nonzero(~has_skill[i])[0]]
+                reasons[i].append(f"Missing mandatory skills: {', '.join(missing)}")
+
+        if self.min_degree:
+            levels = np.fromiter((f['degree_level'] for f in features), dtype=int, count=count)
+            failed = levels < DEGREE_LEVELS[self.min_degree]
+            passed &= ~failed
+            for i in np.nonzero(failed)[0]:
+                reasons[i].append(f"No {self.min_degree} degree or higher found")
+
+        return [
+            {
+                'passed': bool(passed[i]),
+                'action': None if passed[i] else self.action,
+                'reasons': reasons[i]
+            }
+            for i in range(count)
+        ]
@@ -0,0 +1,357 @@
+"""
+Skill taxonomy and single-pass skill matching with an Aho-Corasick automaton
+"""
+import csv
+import json
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+
+
+# Canonical skill name -> aliases. Matching is case-insensitive and respects
+# word boundaries, so "AI" does not match inside "maintain". An entry can
+# also be {"aliases": [...], "ambiguous": True} for names that are everyday
+# words ("go", "rest", "excel"): those match through their aliases anywhere,
+# but by name only as an item of a list, e.g. "Skills: Go, Excel, REST".
+# Bare "ml" is left out of the Machine Learning aliases for the same reason
+DEFAULT_SKILL_TAXONOMY = {
+    'Python': [],
+    'Java': [],
+    'JavaScript': ['ecmascript'],
+    'TypeScript': [],
+    'React': ['react.js', 'reactjs'],
+    'Node.js': ['nodejs', 'node js'],
+    'SQL': [],
+    'PostgreSQL': ['postgres'],
+    'MySQL': [],
+    'MongoDB': ['mongo'],
+    'Redis': [],
+    'AWS': ['amazon web services'],
+    'Azure': ['microsoft azure'],
+    'GCP': ['google cloud', 'google cloud platform'],
+    'Docker': [],
+    'Kubernetes': ['k8s'],
+    'Terraform': [],
+    'CI/CD': ['continuous integration', 'continuous delivery', 'continuous deployment'],
+    'DevOps': [],
+    'Linux': [],
+    'Git': [],
+    'C++': ['cpp'],
+    'C#': ['csharp', 'c sharp'],
+    'Go': {'aliases': ['golang'], 'ambiguous': True},
+    'Rust': [],
+    'Machine Learning': ['ml engineer', 'ml engineering', 'ml models'],
+    'Deep Learning': [],
+    'AI': ['artificial intelligence'],
+    'NLP': ['natural language processing'],
+    'TensorFlow': [],
+    'PyTorch': [],
+    'Scikit-learn': ['sklearn', 'scikit learn'],
+    'Pandas': [],
+    'NumPy': [],
+    'Spark': ['apache spark', 'pyspark'],
+    'Data Science': [],
+    'Analytics': [],
+    'Tableau': [],
+    'Power BI': ['powerbi'],
+    'Excel': {'aliases': ['microsoft excel', 'ms excel', 'excel spreadsheets', 'excel vba'], 'ambiguous': True},
+    'Django': [],
+    'Flask': [],
+    'FastAPI': [],
+    'REST': {'aliases': ['rest api', 'rest apis', 'restful', 'rest services'], 'ambiguous': True},
+    'GraphQL': [],
+    'Agile': [],
+    'Scrum': [],
+    'Project Management': [],
+    'CPA': ['certified public accountant'],
+}
+
+SkillTaxonomy = Dict[str, Union[List[str], Dict]]
+
+# Separators around an item of a skill list: commas, semicolons, pipes,
+# slashes, bullets, a "Skills:" label or the start and end of a line
+LIST_ITEM_BEFORE = r'(?:^|(?<=[,;|/:•·*(-]))[ \t]*'
+LIST_ITEM_AFTER = r'(?=[ \t]*(?:[,;|/•·.()\r]|$))'
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# Resume chunks for semantic matching: lines, bullets and sentences
+CHUNK_SPLIT_PATTERN = re.compile(r'\n+|[•▪●■◦]|(?<=[.;!?])\s+')
+
+SEMANTIC_SKILL_THRESHOLD = 0.5
+MIN_CHUNK_CHARS = 20
+MAX_CHUNK_CHARS = 300
+MAX_CHUNKS = 64
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace so multi-word skills match across line breaks"""
+    return WHITESPACE_PATTERN.sub(' ', text.lower())
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+def skill_entry(entry: Union[List[str], Dict]) -> Tuple[List[str], bool]:
+    """Return the aliases of a taxonomy entry and whether its name is ambiguous"""
+    if isinstance(entry, dict):
+        return list(entry.get('aliases') or []), bool(entry.get('ambiguous'))
+    return list(entry or []), False
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over every skill name and alias in a taxonomy
+
+    Ambiguous names are not in the automaton; a separate pattern finds them
+    where they stand alone as a list item.
+    """
+
+    def __init__(self, taxonomy: SkillTaxonomy):
+        """Compile the taxonomy into a goto/fail/output automaton"""
+        entries = {skill: skill_entry(entry) for skill, entry in taxonomy.items()}
+        # Canonical name -> aliases, without the ambiguity flags
+        self.taxonomy = {skill: aliases for skill, (aliases, _) in entries.items()}
+        self.skills = list(taxonomy)
+        self.ambiguous = {skill for skill, (_, ambiguous) in entries.items() if ambiguous}
+        # Normalized name or alias -> canonical name, for exact lookups
+        self._names: Dict[str, str] = {}
+
+        # goto[node] maps a character to the next node; outputs[node] lists
+        # the (skill index, pattern length) pairs that end at that node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[int, int]]] = [[]]
+
+        for index, skill in enumerate(self.skills):
+            name = _normalize(skill).strip()
+            patterns = {_normalize(alias).strip() for alias in self.taxonomy[skill]}
+            for pattern in patterns | {name}:
+                self._names.setdefault(pattern, skill)
+            if skill not in self.ambiguous:
+                patterns.add(name)
+            for pattern in patterns:
+                if pattern:
+                    self._add_pattern(pattern, index)
+
+        self._build_fail_links()
+
+        self._list_item_pattern = None
+        # Normalized ambiguous name -> taxonomy index
+        self._ambiguous_indices = {
+            _normalize(skill).strip(): index
+            for index, skill in enumerate(self.skills) if skill in self.ambiguous
+        }
+        if self.ambiguous:
+            names = sorted(self.ambiguous, key=len, reverse=True)
+            self._list_item_pattern = re.compile(
+                LIST_ITEM_BEFORE
+                + '(' + '|'.join(r'\s+'.join(map(re.escape, name.split())) for name in names) + ')'
+                + LIST_ITEM_AFTER,
+                re.IGNORECASE | re.MULTILINE
+            )
+
+    def _add_pattern(self, pattern: str, skill_index: int):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node].append((skill_index, len(pattern)))
+
+    def _build_fail_links(self):
+        """Breadth-first pass linking each node to its longest proper suffix"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def find_indices(self, text: str) -> List[int]:
+        """Return the taxonomy indices of all skills found in one pass over text"""
+        if not text:
+            return []
+
+        original_text = text
+        text = _normalize(text)
+        text_length = len(text)
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+
+        found = set()
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            for skill_index, length in outputs[node]:
+                if skill_index in found:
+                    continue
+                start = position - length + 1
+                # Only accept whole-word matches
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if position + 1 < text_length and _is_word_char(text[position + 1]):
+                    continue
+                found.add(skill_index)
+
+        if self._list_item_pattern:
+            for match in self._list_item_pattern.finditer(original_text):
+                found.add(self._ambiguous_indices[_normalize(match.group(1))])
+
+        return sorted(found)
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Canonical name for a skill name or alias, e.g. "k8s" gives Kubernetes"""
+        return self._names.get(_normalize(name).strip())
+
+    def extract(self, text: str) -> List[str]:
+        """Return canonical names of the skills found in text, in taxonomy order"""
+        return [self.skills[index] for index in self.find_indices(text)]
+
+    def extract_batch(self, texts: List[str]) -> List[List[str]]:
+        """Extract skills from many texts with the same compiled automaton"""
+        return [self.extract(text) for text in texts]
+
+
+def load_skill_taxonomy(path: str) -> SkillTaxonomy:
+    """Load a skill taxonomy file
+
+    JSON files map canonical names to alias lists, or to
+    {"aliases": [...], "ambiguous": true} entries. CSV files have one skill
+    per row: the canonical name followed by its aliases; a name ending in
+    "?" (e.g. "Go?,golang") marks it ambiguous.
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {
+            skill: entry if isinstance(entry, dict) else list(entry or [])
+            for skill, entry in data.items()
+        }
+
+    taxonomy = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            row = [cell.strip() for cell in row if cell.strip()]
+            if not row:
+                continue
+            name = row[0]
+            ambiguous = name.endswith('?') and len(name) > 1
+            if ambiguous:
+                name = name[:-1].strip()
+            entry = taxonomy.setdefault(name, {'aliases': [], 'ambiguous': False})
+            entry['aliases'].extend(row[1:])
+            entry['ambiguous'] = entry['ambiguous'] or ambiguous
+    return {
+        name: entry if entry['ambiguous'] else entry['aliases']
+        for name, entry in taxonomy.items()
+    }
+
+
+_default_matcher: Optional[SkillMatcher] = None
+_default_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Get the process-wide matcher, compiled once
+
+    Uses the taxonomy file named by SKILL_TAXONOMY_PATH when set, otherwise
+    DEFAULT_SKILL_TAXONOMY.
+    """
+    global _default_matcher
+    with _default_matcher_lock:
+        if _default_matcher is None:
+            taxonomy_path = os.getenv("SKILL_TAXONOMY_PATH")
+            taxonomy = load_skill_taxonomy(taxonomy_path) if taxonomy_path else DEFAULT_SKILL_TAXONOMY
+            _default_matcher = SkillMatcher(taxonomy)
+        return _default_matcher
+
+
+class SkillEmbeddingIndex:
+    """Skill taxonomy embedded once into a matrix for semantic skill inference
+    
+    Resume chunks are embedded in one batch and scored against every skill
+    with a single matrix multiply, catching paraphrases such as "built CI
+    pipelines" for CI/CD that exact matching misses.
+    """
+    
+    def __init__(self, embedding_model, taxonomy: SkillTaxonomy):
+        """Embed every skill (with its aliases as context) into a normalized matrix"""
+        self.embedding_model = embedding_model
+        self.skills = list(taxonomy)
+        descriptions = []
+        for skill, entry in taxonomy.items():
+            aliases, _ = skill_entry(entry)
+            descriptions.append(f"{skill} ({', '.join(aliases)})" if aliases else skill)
+        # Shape (number of skills, embedding dimension), rows of unit length
+        self.matrix = np.asarray(
+            embedding_model.encode(descriptions, batch_size=64, normalize_embeddings=True),
+            dtype=np.float32
+        )
+    
+    def _chunk(self, text: str) -> List[str]:
+        """Split text into short chunks, merging fragments that are too small"""
+        chunks = []
+        current = ""
+        for piece in CHUNK_SPLIT_PATTERN.split(text):
+            piece = WHITESPACE_PATTERN.sub(' ', piece).strip()
+            if not piece:
+                continue
+            current = f"{current} {piece}".strip() if current else piece
+            if len(current) >= MIN_CHUNK_CHARS:
+                chunks.append(current[:MAX_CHUNK_CHARS])
+                current = ""
+                if len(chunks) >= MAX_CHUNKS:
+                    break
+        if current and len(chunks) < MAX_CHUNKS:
+            chunks.append(current)
+        return chunks
+    
+    def infer(self, text: str, threshold: float = SEMANTIC_SKILL_THRESHOLD) -> List[Dict]:
+        """Return skills whose best chunk similarity reaches threshold, most confident first"""
+        chunks = self._chunk(text or "")
+        if not chunks or not self.skills:
+            return []
+        
+        chunk_matrix = np.asarray(
+            self.embedding_model.encode(chunks, batch_size=32, normalize_embeddings=True),
+            dtype=np.float32
+        )
+        confidence = (chunk_matrix @ self.matrix.T).max(axis=0)
+        
+        matched = np.nonzero(confidence >= threshold)[0]
+        matched = matched[np.argsort(-confidence[matched])]
+        return [
+            {'skill': self.skills[index], 'confidence': round(float(confidence[index]), 3)}
+            for index in matched
+        ]
+
+
+_embedding_indexes = {}
+
+
+def get_skill_embedding_index(embedding_model) -> SkillEmbeddingIndex:
+    """Get the skill matrix for an embedding model, computed once per process"""
+    key = id(embedding_model)
+    with _default_matcher_lock:
+        index = _embedding_indexes.get(key)
+    if index is None:
+        index = SkillEmbeddingIndex(embedding_model, get_skill_matcher().taxonomy)
+        with _default_matcher_lock:
+            index = _embedding_indexes.setdefault(key, index)
+    return index
@@ -0,0 +1,696 @@
+"""
+Embedded SQLite database for single-node deployments and tests
+"""
+import os
+import re
+import json
+import uuid
+import sqlite3
+import threading
+from typing import List, Dict, Iterator, Optional, Tuple
+
+try:
+    from .utils import content_hash, trim_analysis
+except ImportError:
+    from src.utils import content_hash, trim_analysis
+
+
+DEFAULT_SQLITE_PATH = "./screening.db"
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    company TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS resumes (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_hash TEXT,
+    email TEXT,
+    phone TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS screening_results (
+    id TEXT PRIMARY KEY,
+    job_description_id TEXT REFERENCES job_descriptions(id),
+    resume_id TEXT REFERENCES resumes(id),
+    score REAL NOT NULL,
+    model_used TEXT,
+    analysis TEXT,
+    matched_skills TEXT,
+    experience_years REAL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_screening_results_job_id ON screening_results(job_description_id);
+CREATE INDEX IF NOT EXISTS idx_screening_results_resume_id ON screening_results(resume_id);
+CREATE INDEX IF NOT EXISTS idx_screening_results_score ON screening_results(score DESC);
+CREATE INDEX IF NOT EXISTS idx_screening_results_created_at ON screening_results(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_screening_results_created_at_id ON screening_results(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_screening_results_job_resume ON screening_results(job_description_id, resume_id);
+CREATE INDEX IF NOT EXISTS idx_screening_results_job_recommendation
+    ON screening_results(job_description_id, json_extract(analysis, '$.recommendation'), score DESC);
+"""
+
+# Full-text index over resumes, kept in sync by triggers. The filename column
+# is weighted above the content when ranking
+SQLITE_SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5(
+    filename, content, content='resumes', content_rowid='rowid', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN
+    INSERT INTO resumes_fts(rowid, filename, content) VALUES (new.rowid, new.filename, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN
+    INSERT INTO resumes_fts(resumes_fts, rowid, filename, content) VALUES ('delete', old.rowid, old.filename, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS resumes_fts_update AFTER UPDATE OF filename, content ON resumes BEGIN
+    INSERT INTO resumes_fts(resumes_fts, rowid, filename, content) VALUES ('delete', old.rowid, old.filename, old.content);
+    INSERT INTO resumes_fts(rowid, filename, content) VALUES (new.rowid, new.filename, new.content);
+END;
+"""
+
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+# Web search syntax, as accepted by Postgres websearch_to_tsquery: "quoted
+# phrases", -excluded terms and OR between alternatives
+WEBSEARCH_TERM_PATTERN = re.compile(r'(-?)"([^"]*)"?|(-?)([^\s"]+)')
+
+
+def websearch_to_fts5(query: str) -> str:
+    """Translate web search syntax into an FTS5 MATCH expression
+
+    Words and phrases must all match, "a or b" matches either, and -term
+    excludes a term. Every term is quoted, so FTS5 operators in user input
+    are never interpreted. FTS5 has no unary NOT, so a query made only of
+    exclusions returns an empty expression (no results).
+    """
+    groups = []
+    excluded = []
+    pending_or = False
+    for match in WEBSEARCH_TERM_PATTERN.finditer(query or ""):
+        negated = bool(match.group(1) or match.group(3))
+        text = match.group(2) if match.group(2) is not None else match.group(4)
+        if not negated and match.group(4) and text.lower() == "or":
+            pending_or = bool(groups)
+            continue
+
+        words = SEARCH_TOKEN_PATTERN.findall(text)
+        if not words:
+            continue
+        term = '"' + " ".join(words) + '"'
+        if negated:
+            excluded.append(term)
+        elif pending_or:
+            groups[-1].append(term)
+        else:
+            groups.append([term])
+        pending_or = False
+
+    if not groups:
+        return ""
+    expression = " AND ".join(
+        group[0] if len(group) == 1 else "(" + " OR ".join(group) + ")" for group in groups
+    )
+    if excluded:
+        expression = f"({expression}) NOT ({' OR '.join(excluded)})"
+    return expression
+
+# Per-group statistics with nearest-rank percentiles, matching the
+# percentile_disc views in supabase_setup.sql. {group} is the grouping column
+STATS_QUERY = """
+WITH ranked AS (
+    SELECT {group} AS group_key,
+           score,
+           json_extract(analysis, '$.recommendation') AS recommendation,
+           json_extract(analysis, '$.ai_score') AS ai_score,
+           created_at,
+           ROW_NUMBER() OVER (PARTITION BY {group} ORDER BY score) AS position,
+           COUNT(*) OVER (PARTITION BY {group}) AS total
+    FROM screening_results
+    {where}
+)
+SELECT group_key,
+       COUNT(*) AS screenings,
+       AVG(score) AS mean_score,
+       AVG(ai_score) AS mean_ai_score,
+       MIN(CASE WHEN position >= 0.25 * total THEN score END) AS p25_score,
+       MIN(CASE WHEN position >= 0.5 * total THEN score END) AS median_score,
+       MIN(CASE WHEN position >= 0.75 * total THEN score END) AS p75_score,
+       MIN(CASE WHEN position >= 0.9 * total THEN score END) AS p90_score,
+       SUM(recommendation = 'HIRE') AS hire_count,
+       SUM(recommendation = 'MAYBE') AS maybe_count,
+       SUM(recommendation = 'REJECT') AS reject_count,
+       MAX(created_at) AS last_screened_at
+FROM ranked
+GROUP BY group_key
+"""
+
+INSERT_SCREENING_RESULT = """
+INSERT OR IGNORE INTO screening_results
+    (id, job_description_id, resume_id, score, model_used, analysis, matched_skills, experience_years, created_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, strftime('%Y-%m-%dT%H:%M:%f', 'now')))
+"""
+
+
+class SQLiteDatabase:
+    """SQLite implementation of the Database interface
+
+    Rows use the same columns as the Supabase tables, and history rows are
+    shaped like the Supabase joins, so the two backends are interchangeable.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = None):
+        """Open (and create if needed) the database file in WAL mode"""
+        self.path = path or os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        # One connection per instance, shared across Streamlit's threads and
+        # serialized with a lock
+        self._lock = threading.Lock()
+
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self.conn.row_factory = sqlite3.Row
+            # WAL lets readers run while a write is in progress; NORMAL sync
+            # is durable across application crashes in WAL mode
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            with self.conn:
+                self.conn.executescript(SQLITE_SCHEMA)
+            self._migrate_content_hash()
+            self._create_search_index()
+        except Exception as e:
+            print(f"Warning: Failed to open SQLite database {self.path}: {e}")
+            self.conn = None
+
+    def _migrate_content_hash(self):
+        """Add and backfill resumes.content_hash in databases created without it
+
+        Duplicate resumes are merged into their oldest copy before the unique
+        index is created.
+        """
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(resumes)")}
+        with self.conn:
+            if "content_hash" not in columns:
+                self.conn.execute("ALTER TABLE resumes ADD COLUMN content_hash TEXT")
+
+            rows = self.conn.execute(
+                "SELECT id, content FROM resumes WHERE content_hash IS NULL"
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE resumes SET content_hash = ? WHERE id = ?",
+                [(content_hash(row["content"]), row["id"]) for row in rows]
+            )
+
+            if rows:
+                self.conn.execute("""
+                    UPDATE screening_results
+                    SET resume_id = (
+                        SELECT keep.id FROM resumes keep
+                        WHERE keep.content_hash = (SELECT content_hash FROM resumes WHERE id = screening_results.resume_id)
+                        ORDER BY keep.rowid LIMIT 1
+                    )
+                    WHERE resume_id IS NOT NULL
+                """)
+                self.conn.execute("""
+                    DELETE FROM resumes
+                    WHERE rowid NOT IN (SELECT MIN(rowid) FROM resumes GROUP BY content_hash)
+                """)
+
+            self.conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes(content_hash)"
+            )
+
+    def _create_search_index(self):
+        """Create the FTS5 index, indexing existing resumes the first time"""
+        self.search_enabled = False
+        try:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'resumes_fts'"
+            ).fetchone()
+            with self.conn:
+                self.conn.executescript(SQLITE_SEARCH_SCHEMA)
+                if not exists:
+                    self.conn.execute("INSERT INTO resumes_fts(resumes_fts) VALUES ('rebuild')")
+            self.search_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"Warning: SQLite FTS5 is not available, resume search is disabled: {e}")
+
+    def is_connected(self) -> bool:
+        """Check if database is connected"""
+        return self.conn is not None
+
+    def test_connection(self) -> Dict[str, any]:
+        """Test database connection and return status"""
+        result = {
+            "connected": False,
+            "error": None,
+            "tables_exist": False,
+            "message": "",
+            "tables_found": []
+        }
+
+        if not self.conn:
+            result["error"] = "Database not opened"
+            result["message"] = f"[ERROR] Could not open SQLite database at {self.path}"
+            return result
+
+        try:
+            tables_to_check = ["job_descriptions", "resumes", "screening_results"]
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                ).fetchall()
+            existing_tables = [table for table in tables_to_check if table in {row["name"] for row in rows}]
+
+            result["connected"] = True
+            result["tables_exist"] = len(existing_tables) > 0
+            result["tables_found"] = existing_tables
+            result["message"] = f"[OK] SQLite database at {self.path}. Found {len(existing_tables)}/{len(tables_to_check)} tables: {', '.join(existing_tables)}"
+        except Exception as e:
+            result["error"] = str(e)
+            result["message"] = f"[ERROR] SQLite check failed: {str(e)}"
+
+        return result
+
+    def create_tables(self):
+        """Return the SQLite schema (applied automatically on open)"""
+        return SQLITE_SCHEMA
+
+    def _insert(self, sql: str, params: tuple) -> bool:
+        with self._lock, self.conn:
+            self.conn.execute(sql, params)
+        return True
+
+    def save_job_description(self, title: str, description: str, company: str = None,
+                             job_id: str = None) -> Optional[str]:
+        """Save job description to database
+
+        A client-generated job_id makes the save idempotent: saving the same
+        id again leaves the existing row in place.
+        """
+        if not self.is_connected():
+            return None
+
+        job_id = job_id or str(uuid.uuid4())
+        try:
+            self._insert(
+                "INSERT OR IGNORE INTO job_descriptions (id, title, description, company) VALUES (?, ?, ?, ?)",
+                (job_id, title, description, company)
+            )
+            return job_id
+        except Exception as e:
+            print(f"Error saving job description: {e}")
+
+        return None
+
+    def save_resume(self, filename: str, content: str, email: str = None, phone: str = None) -> Optional[str]:
+        """Save resume to database
+
+        Resumes are keyed by the hash of their content: saving a resume that
+        is already stored returns the existing row's id.
+        """
+        if not self.is_connected():
+            return None
+
+        resume_hash = content_hash(content)
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(
+                    """
+                    INSERT INTO resumes (id, filename, content, content_hash, email, phone)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(content_hash) DO NOTHING
+                    """,
+                    (str(uuid.uuid4()), filename, content, resume_hash, email, phone)
+                )
+                row = self.conn.execute(
+                    "SELECT id FROM resumes WHERE content_hash = ?", (resume_hash,)
+                ).fetchone()
+            return row["id"]
+        except Exception as e:
+            print(f"Error saving resume: {e}")
+
+        return None
+
+    def _screening_row(self, job_id: str, resume_id: str, score: float, model_used: str,
+                       analysis: Dict, matched_skills: List[str] = None,
+                       experience_years: float = None, result_id: str = None,
+                       created_at: str = None) -> tuple:
+        return (
+            result_id or str(uuid.uuid4()), job_id, resume_id, score, model_used,
+            json.dumps(trim_analysis(analysis)), json.dumps(matched_skills or []), experience_years,
+            created_at
+        )
+
+    def save_screening_result(self, job_id: str, resume_id: str, score: float,
+                             model_used: str, analysis: Dict, matched_skills: List[str] = None,
+                             experience_years: float = None, result_id: str = None,
+                             created_at: str = None) -> Optional[str]:
+        """Save screening result to database"""
+        if not self.is_connected():
+            return None
+
+        try:
+            row = self._screening_row(job_id, resume_id, score, model_used, analysis,
+                                      matched_skills, experience_years, result_id, created_at)
+            self._insert(INSERT_SCREENING_RESULT, row)
+            return row[0]
+        except Exception as e:
+            print(f"Error saving screening result: {e}")
+
+        return None
+
+    def save_screening_results(self, results: List[Dict]) -> List[Optional[str]]:
+        """Save many screening results in one transaction
+
+        Each item holds the keyword arguments of save_screening_result;
+        results whose result_id is already stored are skipped.
+        """
+        if not self.is_connected() or not results:
+            return [None] * len(results)
+
+        try:
+            rows = [self._screening_row(**result) for result in results]
+            with self._lock, self.conn:
+                self.conn.executemany(INSERT_SCREENING_RESULT, rows)
+            return [row[0] for row in rows]
+        except Exception as e:
+            print(f"Error saving screening results: {e}")
+
+        return [None] * len(results)
+
+    def get_screening_history(self, limit: int = 50, before: Optional[Tuple[str, str]] = None,
+                              since: str = None) -> List[Dict]:
+        """Get one page of screening history, newest first
+
+        Pass the (created_at, id) of the last row of the previous page as
+        before, and optionally a created_at lower bound as since. Rows are
+        shaped like the Supabase history rows.
+        """
+        if not self.is_connected():
+            return []
+
+        conditions = []
+        params = []
+        if before:
+            conditions.append("(s.created_at, s.id) < (?, ?)")
+            params.extend(before)
+        if since:
+            conditions.append("s.created_at >= ?")
+            params.append(since)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        params.append(limit)
+
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    f"""
+                    SELECT s.id, s.created_at, s.score, s.model_used, s.experience_years,
+                           s.job_description_id, s.resume_id,
+                           j.title, j.company, r.filename, r.email
+                    FROM screening_results s
+                    LEFT JOIN job_descriptions j ON j.id = s.job_description_id
+                    LEFT JOIN resumes r ON r.id = s.resume_id
+                    {where}
+                    ORDER BY s.created_at DESC, s.id DESC
+                    LIMIT ?
+                    """,
+                    params
+                ).fetchall()
+
+            return [
+                {
+                    "id": row["id"],
+                    "created_at": row["created_at"],
+                    "score": row["score"],
+                    "model_used": row["model_used"],
+                    "experience_years": row["experience_years"],
+                    "job_description_id": row["job_description_id"],
+                    "resume_id": row["resume_id"],
+                    "job_descriptions": {"title": row["title"], "company": row["company"]},
+                    "resumes": {"filename": row["filename"], "email": row["email"]}
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"Error fetching screening history: {e}")
+            return []
+
+    def get_top_candidates(self, job_id: str, recommendation: str = "HIRE", limit: int = 10,
+                           min_score: float = None, since: str = None) -> List[Dict]:
+        """Get the best scored results for a job with a given recommendation"""
+        if not self.is_connected():
+            return []
+
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    """
+                    SELECT s.id, s.created_at, s.score, s.experience_years, s.resume_id,
+                           json_extract(s.analysis, '$.recommendation') AS recommendation,
+                           json_extract(s.analysis, '$.ai_score') AS ai_score,
+                           r.filename, r.email
+                    FROM screening_results s
+                    LEFT JOIN resumes r ON r.id = s.resume_id
+                    WHERE s.job_description_id = ?
+                      AND json_extract(s.analysis, '$.recommendation') = ?
+                      AND s.score >= ?
+                      AND s.created_at >= ?
+                    ORDER BY s.score DESC
+                    LIMIT ?
+                    """,
+                    (job_id, recommendation, min_score if min_score is not None else float("-inf"),
+                     since or "", limit)
+                ).fetchall()
+
+            return [
+                dict(
+                    {key: row[key] for key in row.keys() if key not in ("filename", "email")},
+                    resumes={"filename": row["filename"], "email": row["email"]}
+                )
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"Error fetching top candidates: {e}")
+            return []
+
+    def _stats(self, group: str, where: str = "", params: tuple = ()) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute(STATS_QUERY.format(group=group, where=where), params).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_resumes(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """Search stored resumes by keyword, best matches first
+
+        The query accepts the same web search syntax as the Supabase
+        backend: quoted phrases, OR and -term (see websearch_to_fts5). Words
+        match with stemming. Each row has id, filename, email, created_at,
+        rank and snippet.
+        """
+        match = websearch_to_fts5(query)
+        if not self.is_connected() or not self.search_enabled or not match:
+            return []
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    """
+                    SELECT r.id, r.filename, r.email, r.created_at,
+                           -bm25(resumes_fts, 2.0, 1.0) AS rank,
+                           snippet(resumes_fts, 1, '[', ']', '…', 15) AS snippet
+                    FROM resumes_fts
+                    JOIN resumes r ON r.rowid = resumes_fts.rowid
+                    WHERE resumes_fts MATCH ?
+                    ORDER BY bm25(resumes_fts, 2.0, 1.0), r.created_at DESC
+                    LIMIT ? OFFSET ?
+                    """,
+                    (match, limit, offset)
+                ).fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Error searching resumes: {e}")
+            return []
+
+    def get_job_stats(self, job_id: str = None, limit: int = 50, materialized: bool = False) -> List[Dict]:
+        """Get per-job score statistics and recommendation counts
+
+        materialized is accepted for interface compatibility; SQLite always
+        computes the statistics on the fly.
+        """
+        if not self.is_connected():
+            return []
+
+        try:
+            stats = self._stats(
+                "job_description_id",
+                "WHERE job_description_id = ?" if job_id else "",
+                (job_id,) if job_id else ()
+            )
+            stats.sort(key=lambda row: row["last_screened_at"] or "", reverse=True)
+            stats = stats[:limit]
+
+            job_ids = [row["group_key"] for row in stats]
+            with self._lock:
+                titles = dict(self.conn.execute(
+                    f"SELECT id, title FROM job_descriptions WHERE id IN ({', '.join('?' * len(job_ids))})",
+                    job_ids
+                ).fetchall())
+            for row in stats:
+                row["job_id"] = row.pop("group_key")
+                row["title"] = titles.get(row["job_id"])
+                del row["mean_ai_score"]
+            return stats
+        except Exception as e:
+            print(f"Error fetching job statistics: {e}")
+            return []
+
+    def get_model_stats(self, materialized: bool = False) -> List[Dict]:
+        """Get per-model score statistics and recommendation counts"""
+        if not self.is_connected():
+            return []
+
+        try:
+            stats = self._stats("model_used")
+            for row in stats:
+                row["model_used"] = row.pop("group_key")
+            stats.sort(key=lambda row: row["screenings"], reverse=True)
+            return stats
+        except Exception as e:
+            print(f"Error fetching model statistics: {e}")
+            return []
+
+    def get_model_agreement(self) -> List[Dict]:
+        """Get how often each pair of models agrees on the same job and resume"""
+        if not self.is_connected():
+            return []
+
+        try:
+            with self._lock:
+                rows = self.conn.execute(
+                    """
+                    SELECT a.model_used AS model_a,
+                           b.model_used AS model_b,
+                           COUNT(*) AS shared_screenings,
+                           AVG(json_extract(a.analysis, '$.recommendation') = json_extract(b.analysis, '$.recommendation'))
+                               AS recommendation_agreement,
+                           AVG(ABS(a.score - b.score)) AS mean_score_difference
+                    FROM screening_results a
+                    JOIN screening_results b
+                      ON b.job_description_id = a.job_description_id
+                     AND b.resume_id = a.resume_id
+                     AND b.model_used > a.model_used
+                    GROUP BY a.model_used, b.model_used
+                    ORDER BY shared_screenings DESC
+                    """
+                ).fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"Error fetching model agreement: {e}")
+            return []
+
+    def refresh_stats(self) -> bool:
+        """Nothing to refresh: SQLite statistics are never materialized"""
+        return self.is_connected()
+
+    def get_screening_detail(self, result_id: str, created_at: str = None) -> Optional[Dict]:
+        """Get the heavy fields of one screening result
+
+        created_at is accepted for parity with the partitioned Supabase
+        table; the primary key lookup does not need it here.
+        """
+        if not self.is_connected():
+            return None
+
+        try:
+            with self._lock:
+                row = self.conn.execute(
+                    """
+                    SELECT s.id, s.analysis, s.matched_skills, j.description, r.content, r.phone
+                    FROM screening_results s
+                    LEFT JOIN job_descriptions j ON j.id = s.job_description_id
+                    LEFT JOIN resumes r ON r.id = s.resume_id
+                    WHERE s.id = ?
+                    """,
+                    (result_id,)
+                ).fetchone()
+
+            if row is None:
+                return None
+            return {
+                "id": row["id"],
+                "analysis": json.loads(row["analysis"]) if row["analysis"] else None,
+                "matched_skills": json.loads(row["matched_skills"]) if row["matched_skills"] else [],
+                "job_descriptions": {"description": row["description"]},
+                "resumes": {"content": row["content"], "phone": row["phone"]}
+            }
+        except Exception as e:
+            print(f"Error fetching screening detail: {e}")
+            return None
+
+    def ensure_partitions(self, months_ahead: int = 3) -> bool:
+        """Nothing to create: the SQLite table is not partitioned"""
+        return self.is_connected()
+
+    def retention_boundary(self, cutoff: str) -> str:
+        """Rows are deleted individually, so the cutoff is used as is"""
+        return cutoff
+
+    def iter_screening_results_before(self, before: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Yield every screening result created before a timestamp, oldest first
+
+        Errors are raised rather than printed, so a caller archiving the
+        rows never mistakes a failed read for the end of the data.
+        """
+        if not self.is_connected():
+            raise ConnectionError(f"SQLite database {self.path} is not open")
+
+        after = ("", "")
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    """
+                    SELECT id, created_at, job_description_id, resume_id, score, model_used,
+                           analysis, matched_skills, experience_years
+                    FROM screening_results
+                    WHERE created_at < ? AND (created_at, id) > (?, ?)
+                    ORDER BY created_at, id
+                    LIMIT ?
+                    """,
+                    (before, after[0], after[1], batch_size)
+                ).fetchall()
+
+            for row in rows:
+                yield dict(
+                    dict(row),
+                    analysis=json.loads(row["analysis"]) if row["analysis"] else None,
+                    matched_skills=json.loads(row["matched_skills"]) if row["matched_skills"] else []
+                )
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1]["created_at"], rows[-1]["id"])
+
+    def purge_screening_results(self, before: str) -> Optional[int]:
+        """Delete screening results created before a timestamp; returns the row count"""
+        if not self.is_connected():
+            return None
+
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.execute("DELETE FROM screening_results WHERE created_at < ?", (before,))
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Error deleting screening results: {e}")
+            return None
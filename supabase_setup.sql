@@ -11,19 +11,38 @@ CREATE TABLE IF NOT EXISTS job_descriptions (
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
--- Create resumes table
+-- Create resumes table, one row per unique resume text
 CREATE TABLE IF NOT EXISTS resumes (
     id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
     filename TEXT NOT NULL,
     content TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
     email TEXT,
     phone TEXT,
     created_at TIMESTAMP DEFAULT NOW()
 );
 
--- Create screening_results table
+-- Partitioning upgrade: databases created before screening_results was
+-- partitioned have a plain table. Move it aside; its rows are copied into
+-- the partitioned table below. Safe to run more than once.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_class
+        WHERE relname = 'screening_results' AND relkind = 'r'
+          AND relnamespace = 'public'::regnamespace
+    ) THEN
+        ALTER TABLE screening_results RENAME TO screening_results_unpartitioned;
+        ALTER INDEX IF EXISTS screening_results_pkey RENAME TO screening_results_unpartitioned_pkey;
+    END IF;
+END;
+$$;
+
+-- Create screening_results table, partitioned by month of created_at.
+-- The primary key must include the partition key; the app supplies both
+-- id and created_at so retried inserts hit the same key
 CREATE TABLE IF NOT EXISTS screening_results (
-    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    id UUID DEFAULT gen_random_uuid(),
     job_description_id UUID REFERENCES job_descriptions(id),
     resume_id UUID REFERENCES resumes(id),
     score FLOAT NOT NULL,
@@ -31,15 +50,335 @@ CREATE TABLE IF NOT EXISTS screening_results (
     analysis JSONB,
     matched_skills TEXT[],
     experience_years FLOAT,
-    created_at TIMESTAMP DEFAULT NOW()
-);
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside the monthly partitions; create_screening_partitions
+-- moves them into their month when that partition is created
+CREATE TABLE IF NOT EXISTS screening_results_default PARTITION OF screening_results DEFAULT;
+
+-- Create monthly partitions (screening_results_pYYYY_MM) from the month of
+-- start_at through months_ahead months from now. Called by
+-- Database.ensure_partitions(); schedule it monthly, e.g. with pg_cron:
+--   SELECT cron.schedule('screening-partitions', '0 0 1 * *', 'SELECT create_screening_partitions()');
+-- Runs as the table owner, since the API roles cannot create partitions
+CREATE OR REPLACE FUNCTION create_screening_partitions(months_ahead INT DEFAULT 3, start_at TIMESTAMP DEFAULT NOW())
+RETURNS INT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', start_at)::date;
+    last_month DATE := (date_trunc('month', NOW()) + make_interval(months => months_ahead))::date;
+    month_end DATE;
+    partition_name TEXT;
+    created INT := 0;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        month_end := (month_start + INTERVAL '1 month')::date;
+        partition_name := 'screening_results_p' || to_char(month_start, 'YYYY_MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            IF EXISTS (
+                SELECT 1 FROM screening_results_default
+                WHERE created_at >= month_start AND created_at < month_end
+            ) THEN
+                -- A new partition cannot overlap rows held by the default one
+                EXECUTE format('CREATE TABLE %I (LIKE screening_results INCLUDING DEFAULTS)', partition_name);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM screening_results_default '
+                    'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    month_start, month_end, partition_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE screening_results ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF screening_results FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            END IF;
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+-- Drop the monthly partitions that end on or before older_than, and delete
+-- older rows from the default partition. Called by the retention job after
+-- it has archived those rows (see retention.py)
+CREATE OR REPLACE FUNCTION drop_screening_partitions(older_than TIMESTAMP)
+RETURNS INT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    partition_name TEXT;
+    dropped INT := 0;
+BEGIN
+    FOR partition_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'screening_results'::regclass
+          AND c.relname ~ '^screening_results_p[0-9]{4}_[0-9]{2}$'
+    LOOP
+        IF to_date(right(partition_name, 7), 'YYYY_MM') + INTERVAL '1 month' <= older_than THEN
+            EXECUTE format('DROP TABLE %I', partition_name);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    DELETE FROM screening_results_default WHERE created_at < older_than;
+    RETURN dropped;
+END;
+$$;
+
+-- Only the service role (used by the retention job) may manage partitions.
+-- Supabase grants EXECUTE on new public functions to anon and authenticated
+-- by default, so those grants are revoked explicitly along with PUBLIC's
+REVOKE ALL ON FUNCTION create_screening_partitions(INT, TIMESTAMP) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION drop_screening_partitions(TIMESTAMP) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION create_screening_partitions(INT, TIMESTAMP) TO service_role;
+GRANT EXECUTE ON FUNCTION drop_screening_partitions(TIMESTAMP) TO service_role;
+
+SELECT create_screening_partitions();
+
+-- Copy the rows of a table moved aside by the upgrade above. Dropping it
+-- also drops the statistics views, which are recreated further down
+DO $$
+DECLARE
+    oldest TIMESTAMP;
+BEGIN
+    IF to_regclass('screening_results_unpartitioned') IS NOT NULL THEN
+        SELECT MIN(created_at) INTO oldest FROM screening_results_unpartitioned;
+        PERFORM create_screening_partitions(3, COALESCE(oldest, NOW()));
+        INSERT INTO screening_results
+            (id, job_description_id, resume_id, score, model_used, analysis,
+             matched_skills, experience_years, created_at)
+        SELECT id, job_description_id, resume_id, score, model_used, analysis,
+               matched_skills, experience_years, COALESCE(created_at, NOW())
+        FROM screening_results_unpartitioned;
+        DROP TABLE screening_results_unpartitioned CASCADE;
+    END IF;
+END;
+$$;
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_screening_results_job_id ON screening_results(job_description_id);
 CREATE INDEX IF NOT EXISTS idx_screening_results_resume_id ON screening_results(resume_id);
 CREATE INDEX IF NOT EXISTS idx_screening_results_score ON screening_results(score DESC);
 CREATE INDEX IF NOT EXISTS idx_screening_results_created_at ON screening_results(created_at DESC);
+-- Keyset pagination for screening history: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_screening_results_created_at_id ON screening_results(created_at DESC, id DESC);
+
+-- Filtering inside the analysis JSONB: containment queries (analysis @> '{...}')
+-- use the GIN index; "top N HIRE for a job" uses the expression index
+CREATE INDEX IF NOT EXISTS idx_screening_results_analysis ON screening_results USING GIN (analysis jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_screening_results_job_recommendation
+    ON screening_results(job_description_id, (analysis->>'recommendation'), score DESC);
+-- Only numeric ai_score values are cast, so an unexpected string in the
+-- analysis cannot make an insert fail
+DROP INDEX IF EXISTS idx_screening_results_ai_score;
+CREATE INDEX IF NOT EXISTS idx_screening_results_ai_score_number
+    ON screening_results((CASE WHEN jsonb_typeof(analysis->'ai_score') = 'number'
+                               THEN (analysis->>'ai_score')::float END) DESC);
+
+-- Resume dedup: upgrade databases created before resumes had content_hash.
+-- Safe to run more than once.
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Backfill with the same SHA-256 hex digest the app computes
+UPDATE resumes
+SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+WHERE content_hash IS NULL;
+
+-- Point screenings at the oldest copy of each resume, then drop the copies
+WITH ranked AS (
+    SELECT id,
+           FIRST_VALUE(id) OVER (PARTITION BY content_hash ORDER BY created_at, id) AS keep_id
+    FROM resumes
+)
+UPDATE screening_results s
+SET resume_id = ranked.keep_id
+FROM ranked
+WHERE s.resume_id = ranked.id AND ranked.id <> ranked.keep_id;
+
+-- The survivor is picked by the same window as above, so rows with a NULL
+-- created_at are deleted too rather than compared as unknown
+WITH ranked AS (
+    SELECT id,
+           FIRST_VALUE(id) OVER (PARTITION BY content_hash ORDER BY created_at, id) AS keep_id
+    FROM resumes
+)
+DELETE FROM resumes r
+USING ranked
+WHERE r.id = ranked.id AND ranked.id <> ranked.keep_id;
+
+ALTER TABLE resumes ALTER COLUMN content_hash SET NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes(content_hash);
+
+-- Native JSONB analysis: older versions stored json.dumps(analysis), a JSON
+-- string inside JSONB. Decode those rows and drop fields that are no longer
+-- stored (metadata with resume sections, skills and experience have columns).
+-- Safe to run more than once.
+UPDATE screening_results
+SET analysis = (analysis #>> '{}')::jsonb
+WHERE jsonb_typeof(analysis) = 'string';
+
+UPDATE screening_results
+SET analysis = analysis - 'metadata' - 'matched_skills' - 'experience_years'
+                        - 'model_used' - 'resume_id' - 'resume_index' - 'filename' - 'rank'
+WHERE analysis ?| ARRAY['metadata', 'matched_skills', 'experience_years', 'model_used',
+                       'resume_id', 'resume_index', 'filename', 'rank'];
+
+-- Aggregate analytics, computed in the database.
+-- Percentiles use percentile_disc (nearest rank), matching the SQLite backend.
+CREATE INDEX IF NOT EXISTS idx_screening_results_job_resume ON screening_results(job_description_id, resume_id);
+
+CREATE OR REPLACE VIEW job_screening_stats AS
+SELECT
+    s.job_description_id AS job_id,
+    j.title,
+    COUNT(*) AS screenings,
+    AVG(s.score) AS mean_score,
+    percentile_disc(0.25) WITHIN GROUP (ORDER BY s.score) AS p25_score,
+    percentile_disc(0.5) WITHIN GROUP (ORDER BY s.score) AS median_score,
+    percentile_disc(0.75) WITHIN GROUP (ORDER BY s.score) AS p75_score,
+    percentile_disc(0.9) WITHIN GROUP (ORDER BY s.score) AS p90_score,
+    COUNT(*) FILTER (WHERE s.analysis->>'recommendation' = 'HIRE') AS hire_count,
+    COUNT(*) FILTER (WHERE s.analysis->>'recommendation' = 'MAYBE') AS maybe_count,
+    COUNT(*) FILTER (WHERE s.analysis->>'recommendation' = 'REJECT') AS reject_count,
+    MAX(s.created_at) AS last_screened_at
+FROM screening_results s
+LEFT JOIN job_descriptions j ON j.id = s.job_description_id
+GROUP BY s.job_description_id, j.title;
+
+CREATE OR REPLACE VIEW model_screening_stats AS
+SELECT
+    s.model_used,
+    COUNT(*) AS screenings,
+    AVG(s.score) AS mean_score,
+    AVG(CASE WHEN jsonb_typeof(s.analysis->'ai_score') = 'number'
+             THEN (s.analysis->>'ai_score')::float END) AS mean_ai_score,
+    percentile_disc(0.25) WITHIN GROUP (ORDER BY s.score) AS p25_score,
+    percentile_disc(0.5) WITHIN GROUP (ORDER BY s.score) AS median_score,
+    percentile_disc(0.75) WITHIN GROUP (ORDER BY s.score) AS p75_score,
+    percentile_disc(0.9) WITHIN GROUP (ORDER BY s.score) AS p90_score,
+    COUNT(*) FILTER (WHERE s.analysis->>'recommendation' = 'HIRE') AS hire_count,
+    COUNT(*) FILTER (WHERE s.analysis->>'recommendation' = 'MAYBE') AS maybe_count,
+    COUNT(*) FILTER (WHERE s.analysis->>'recommendation' = 'REJECT') AS reject_count,
+    MAX(s.created_at) AS last_screened_at
+FROM screening_results s
+GROUP BY s.model_used;
+
+-- How often two models agree when they screened the same resume for the same job
+CREATE OR REPLACE VIEW model_agreement_stats AS
+SELECT
+    a.model_used AS model_a,
+    b.model_used AS model_b,
+    COUNT(*) AS shared_screenings,
+    AVG(CASE WHEN a.analysis->>'recommendation' = b.analysis->>'recommendation' THEN 1.0 ELSE 0.0 END) AS recommendation_agreement,
+    AVG(ABS(a.score - b.score)) AS mean_score_difference
+FROM screening_results a
+JOIN screening_results b
+  ON b.job_description_id = a.job_description_id
+ AND b.resume_id = a.resume_id
+ AND b.model_used > a.model_used
+GROUP BY a.model_used, b.model_used;
+
+-- Materialized copies for dashboards over large tables. The unique indexes
+-- allow REFRESH ... CONCURRENTLY, which does not block readers
+CREATE MATERIALIZED VIEW IF NOT EXISTS job_screening_stats_mv AS SELECT * FROM job_screening_stats;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_job_screening_stats_mv_job_id ON job_screening_stats_mv(job_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS model_screening_stats_mv AS SELECT * FROM model_screening_stats;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_model_screening_stats_mv_model ON model_screening_stats_mv(model_used);
+
+-- Called by Database.refresh_stats(), e.g. from a scheduled job (pg_cron)
+CREATE OR REPLACE FUNCTION refresh_screening_stats()
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY job_screening_stats_mv;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY model_screening_stats_mv;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION refresh_screening_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_screening_stats() TO service_role;
+
+-- Full-text search over stored resumes. The filename is weighted above the
+-- body; the generated column is maintained by Postgres on every write
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(filename, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_resumes_search_vector ON resumes USING GIN (search_vector);
+
+-- Ranked talent pool search; called by Database.search_resumes().
+-- Snippets are only built for the rows of the requested page
+CREATE OR REPLACE FUNCTION search_resumes(search_query TEXT, result_limit INT DEFAULT 20, result_offset INT DEFAULT 0)
+RETURNS TABLE (
+    id UUID,
+    filename TEXT,
+    email TEXT,
+    created_at TIMESTAMP,
+    rank REAL,
+    snippet TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', search_query) AS q
+    ),
+    matches AS (
+        SELECT r.id, r.filename, r.email, r.created_at, r.content,
+               ts_rank_cd(r.search_vector, query.q) AS rank
+        FROM resumes r, query
+        WHERE r.search_vector @@ query.q
+        ORDER BY rank DESC, r.created_at DESC
+        LIMIT result_limit OFFSET result_offset
+    )
+    SELECT m.id, m.filename, m.email, m.created_at, m.rank,
+           ts_headline('english', m.content, query.q,
+                       'MaxFragments=2, MaxWords=15, MinWords=5, StartSel=[, StopSel=]') AS snippet
+    FROM matches m, query
+    ORDER BY m.rank DESC, m.created_at DESC;
+$$;
+
+-- pgvector backend (VECTOR_BACKEND=pgvector): resume embeddings and their
+-- filterable metadata live on the resumes table. PgVectorStore creates the
+-- same objects on first use; vector(384) matches all-MiniLM-L6-v2
+CREATE EXTENSION IF NOT EXISTS vector;
+
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS embedding vector(384);
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS search_metadata JSONB;
+
+-- Cosine KNN (ORDER BY embedding <=> query) and metadata filters
+CREATE INDEX IF NOT EXISTS idx_resumes_embedding_hnsw ON resumes USING hnsw (embedding vector_cosine_ops);
+CREATE INDEX IF NOT EXISTS idx_resumes_search_metadata ON resumes USING GIN (search_metadata jsonb_path_ops);
+
+-- Job description embeddings, keyed by a hash of the text
+CREATE TABLE IF NOT EXISTS job_embeddings (
+    id TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    embedding vector(384) NOT NULL,
+    metadata JSONB,
+    created_at TIMESTAMP DEFAULT NOW()
+);
 
 -- Success message (this won't execute, just for reference)
 -- After running this script, you should see: "Success. No rows returned"
-
@@ -0,0 +1,13 @@
+"""
+Test configuration: expose the package directory as `src`, as app.py does
+"""
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+if 'src' not in sys.modules:
+    src_package = types.ModuleType('src')
+    src_package.__path__ = [str(PACKAGE_DIR)]
+    sys.modules['src'] = src_package
@@ -0,0 +1,32 @@
+"""
+Tests for the Supabase backend that do not need a Supabase project
+"""
+import re
+
+from src.database import Database
+
+
+def test_setup_sql_creates_partitions_and_their_functions():
+    sql = Database.create_tables(None)
+
+    assert "PARTITION BY RANGE (created_at)" in sql
+    assert "CREATE OR REPLACE FUNCTION create_screening_partitions" in sql
+    assert "CREATE OR REPLACE FUNCTION drop_screening_partitions" in sql
+    assert "SELECT create_screening_partitions();" in sql
+
+
+def test_retention_boundary_is_the_start_of_the_month():
+    assert Database.retention_boundary(None, "2024-05-17T12:34:56.789") == "2024-05-01T00:00:00.000"
+
+
+def test_security_definer_functions_are_only_executable_by_the_service_role():
+    sql = Database.create_tables(None)
+    definitions = re.findall(r"CREATE OR REPLACE FUNCTION (\w+)\(.*?\nAS \$\$", sql, re.S)
+    definers = [name for name in definitions
+                if re.search(rf"FUNCTION {name}\(.*?SECURITY DEFINER\nSET search_path = public\n", sql, re.S)]
+
+    assert set(definers) == {"create_screening_partitions", "drop_screening_partitions", "refresh_screening_stats"}
+    assert sql.count("SECURITY DEFINER") == len(definers)
+    for name in definers:
+        assert re.search(rf"REVOKE ALL ON FUNCTION {name}\(.*\) FROM PUBLIC, anon, authenticated;", sql)
+        assert re.search(rf"GRANT EXECUTE ON FUNCTION {name}\(.*\) TO service_role;", sql)
@@ -0,0 +1,60 @@
+"""
+Tests for employment date ranges and tenure
+"""
+from datetime import date
+
+from src.experience import extract_date_ranges, extract_experience, merge_intervals
+
+TODAY = date(2024, 6, 15)
+
+
+def test_merge_intervals_joins_overlapping_and_adjacent():
+    assert merge_intervals([(10, 20), (0, 5), (5, 8), (15, 30)]) == [(0, 8), (10, 30)]
+
+
+def test_overlapping_roles_are_not_double_counted():
+    text = "Engineer, Acme\nJan 2018 - Dec 2019\nConsultant, Beta\nJan 2019 - Dec 2020"
+
+    experience = extract_experience(text, today=TODAY)
+
+    assert experience['total_months'] == 36
+    assert experience['total_years'] == 3.0
+    assert experience['source'] == 'date_ranges'
+
+
+def test_present_runs_until_today():
+    ranges = extract_date_ranges("Lead, Acme\nMar 2022 - Present", today=TODAY)
+
+    assert ranges[0]['end'] == 'present'
+    assert ranges[0]['months'] == 28
+
+
+def test_bare_years_run_from_january_to_december():
+    ranges = extract_date_ranges("2015-2018 Analyst\nJan 2015 - Dec 2018 Analyst\n2018 - 2018 Intern", today=TODAY)
+
+    assert [r['months'] for r in ranges] == [48, 48, 12]
+
+
+def test_stated_experience_is_the_fallback():
+    experience = extract_experience("Over 7+ years of professional experience", today=TODAY)
+
+    assert experience['total_years'] == 7.0
+    assert experience['source'] == 'stated'
+
+
+def test_spans_leave_out_education_dates():
+    text = "Experience\nEngineer, Acme\n2019 - 2021\nEducation\nB.Sc., State University\n2012 - 2016"
+    experience_end = text.index("\nEducation")
+
+    experience = extract_experience(text, today=TODAY, spans=[[0, experience_end]])
+
+    assert experience['total_years'] == 3.0
+    assert [role['start'] for role in experience['roles']] == ['2019-01']
+
+
+def test_spans_without_dates_fall_back_to_the_whole_text():
+    text = "Experience\nSee below\nEngineer, Acme\n2019 - 2020"
+
+    experience = extract_experience(text, today=TODAY, spans=[[0, len("Experience\nSee below")]])
+
+    assert experience['total_years'] == 2.0
@@ -0,0 +1,94 @@
+"""
+Tests for the BM25 index and reciprocal rank fusion
+"""
+import threading
+
+from src.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_skill_punctuation():
+    assert tokenize("C++, C# and Node.js.") == ["c++", "c#", "and", "node.js"]
+
+
+def test_search_ranks_documents_sharing_rare_terms_first():
+    index = BM25Index()
+    index.add("a", "Python developer with Kubernetes and Terraform")
+    index.add("b", "Python developer")
+    index.add("c", "Accountant with CPA")
+
+    hits = index.search("Kubernetes Python", top_k=10)
+
+    assert [doc_id for doc_id, _ in hits] == ["a", "b"]
+    assert hits[0][1] > hits[1][1]
+
+
+def test_add_ignores_known_documents():
+    index = BM25Index()
+    index.add("a", "python")
+    index.add("a", "java java java")
+
+    assert len(index) == 1
+    assert index.search("java") == []
+
+
+def test_log_is_replayed_into_a_new_index(tmp_path):
+    log_path = str(tmp_path / "bm25.jsonl")
+    index = BM25Index(log_path=log_path)
+    index.add_many([("a", "rust engineer"), ("b", "go engineer")])
+
+    replayed = BM25Index(log_path=log_path)
+
+    assert "a" in replayed and "b" in replayed
+    assert replayed.search("rust")[0][0] == "a"
+
+
+def test_clear_removes_documents_and_log(tmp_path):
+    log_path = tmp_path / "bm25.jsonl"
+    index = BM25Index(log_path=str(log_path))
+    index.add("a", "python")
+
+    index.clear()
+
+    assert len(index) == 0
+    assert not log_path.exists()
+
+
+def test_concurrent_adds_and_searches_keep_the_index_consistent():
+    index = BM25Index()
+    errors = []
+
+    def add(start):
+        for n in range(start, start + 200):
+            index.add(f"doc{n}", f"python engineer number{n}")
+
+    def search():
+        try:
+            for _ in range(200):
+                index.search("python engineer", top_k=5)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=add, args=(start,)) for start in (0, 200, 400)]
+    threads += [threading.Thread(target=search) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(index) == 600
+    assert index.total_length == sum(index.doc_lengths.values())
+    assert len(index.postings["python"]) == 600
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]], k=60)
+
+    assert fused[0][0] == "b"
+    assert {doc_id for doc_id, _ in fused} == {"a", "b", "c"}
+
+
+def test_reciprocal_rank_fusion_weights():
+    fused = reciprocal_rank_fusion([["a"], ["b"]], weights=[1.0, 2.0])
+
+    assert [doc_id for doc_id, _ in fused] == ["b", "a"]
@@ -0,0 +1,107 @@
+"""
+Tests for the write-behind outbox
+"""
+import pytest
+
+from src.outbox import ScreeningOutbox
+from src.sqlite_database import SQLiteDatabase
+
+
+class FlakyDatabase:
+    """Delegates to a real database after failing a number of writes"""
+
+    def __init__(self, database, failures):
+        self.database = database
+        self.failures = failures
+
+    def save_job_description(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        return self.database.save_job_description(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.database, name)
+
+
+@pytest.fixture
+def database(tmp_path):
+    return SQLiteDatabase(str(tmp_path / "screening.db"))
+
+
+def screenings(count=2):
+    return [
+        {"filename": f"r{i}.pdf", "content": f"resume {i}", "score": 50 + i,
+         "model_used": "openai", "analysis": {"recommendation": "MAYBE"}}
+        for i in range(count)
+    ]
+
+
+def test_entries_are_saved_and_removed(tmp_path, database):
+    outbox = ScreeningOutbox(database, path=str(tmp_path / "outbox.db"))
+
+    job_id = outbox.enqueue_screening("Eng", "desc", screenings())
+
+    assert outbox.flush()
+    history = database.get_screening_history()
+    assert len(history) == 2
+    assert {row['job_description_id'] for row in history} == {job_id}
+
+
+def test_failed_entries_are_retried_with_backoff(tmp_path, database):
+    outbox = ScreeningOutbox(FlakyDatabase(database, failures=1), path=str(tmp_path / "outbox.db"),
+                             base_delay=0.0)
+    outbox.enqueue_screening("Eng", "desc", screenings())
+
+    assert outbox.drain() == 0
+    assert outbox.pending_count() == 1
+    assert outbox.drain() == 1
+    assert outbox.pending_count() == 0
+    assert len(database.get_screening_history()) == 2
+
+
+def test_entries_survive_a_restart(tmp_path, database):
+    path = str(tmp_path / "outbox.db")
+    ScreeningOutbox(FlakyDatabase(database, failures=1), path=path).enqueue_screening("Eng", "desc", screenings())
+
+    reopened = ScreeningOutbox(database, path=path)
+
+    assert reopened.pending_count() == 1
+    assert reopened.flush()
+
+
+def test_runs_of_the_same_job_description_share_one_job(tmp_path, database):
+    outbox = ScreeningOutbox(database, path=str(tmp_path / "outbox.db"))
+    claude_screenings = [dict(screening, model_used="claude") for screening in screenings()]
+
+    first = outbox.enqueue_screening("Eng", "Python engineer", screenings())
+    second = outbox.enqueue_screening("Eng (rerun)", "Python  engineer", claude_screenings)
+    other = outbox.enqueue_screening("Ops", "SRE", screenings())
+
+    assert first == second != other
+    assert outbox.flush()
+    [job_stats] = database.get_job_stats(job_id=first)
+    assert job_stats["screenings"] == 4
+    [agreement] = database.get_model_agreement()
+    assert agreement["shared_screenings"] == 2
+
+
+def test_entries_are_dead_lettered_after_max_attempts(tmp_path, database):
+    outbox = ScreeningOutbox(FlakyDatabase(database, failures=2), path=str(tmp_path / "outbox.db"),
+                             base_delay=0.0, max_attempts=2)
+    outbox.enqueue_screening("Eng", "desc", screenings())
+    outbox.enqueue_screening("Ops", "desc", screenings(1))
+
+    assert outbox.drain() == 0
+    assert outbox.drain() == 0
+
+    assert outbox.pending_count() == 1
+    assert outbox.dead_letter_count() == 1
+    # The dead entry no longer blocks the one queued after it
+    assert outbox.flush()
+    assert len(database.get_screening_history()) == 1
+
+
+def test_max_attempts_must_be_positive(tmp_path, database):
+    with pytest.raises(ValueError):
+        ScreeningOutbox(database, path=str(tmp_path / "outbox.db"), max_attempts=0)
@@ -0,0 +1,83 @@
+"""
+Tests for resume parsing limits and section segmentation
+"""
+import io
+
+import pytest
+
+from src.parsers import parse_resume_document, segment_resume, section_text
+
+RESUME = (
+    "Jane Doe\n"
+    "jane@example.com | 555-123-4567\n"
+    "Summary\n"
+    "Backend engineer\n"
+    "Professional Experience\n"
+    "Acme Corp, 2019 - Present\n"
+    "Built services\n"
+    "Education\n"
+    "B.Sc. Computer Science\n"
+    "Technical Skills\n"
+    "Python, SQL"
+)
+
+
+def test_contact_details():
+    segments = segment_resume(RESUME)
+
+    assert segments['email'] == "jane@example.com"
+    assert segments['phone'] == "555-123-4567"
+
+
+def test_sections_are_offsets_into_the_text():
+    spans = segment_resume(RESUME)['spans']
+
+    assert section_text(RESUME, spans['experience']) == (
+        "Professional Experience\nAcme Corp, 2019 - Present\nBuilt services"
+    )
+    assert section_text(RESUME, spans['education']) == "Education\nB.Sc. Computer Science"
+    assert section_text(RESUME, spans['skills']) == "Technical Skills\nPython, SQL"
+
+
+def test_long_lines_do_not_start_sections():
+    text = "Summary\n" + "I gained a lot of experience leading teams across several large projects\n"
+
+    spans = segment_resume(text)['spans']
+
+    assert spans['experience'] == []
+    assert len(spans['summary']) == 1
+
+
+def test_case_fold_variants_of_headers_start_sections():
+    text = "Summary\nBackend engineer\nſkills\nPython"
+
+    spans = segment_resume(text)['spans']
+
+    assert section_text(text, spans['skills']) == "ſkills\nPython"
+
+
+def test_character_limit_never_keeps_part_of_a_block_past_the_budget():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("abcde")
+    document.add_paragraph("xyz")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    parsed = parse_resume_document(buffer.getvalue(), "resume.docx", max_chars=5)
+
+    assert parsed['text'] == "abcde"
+    assert parsed['truncated'] and parsed['truncation_reason'] == 'max_chars'
+
+
+def test_lines_that_only_mention_a_keyword_do_not_start_sections():
+    text = (
+        "Work Experience\nSenior Engineer\n- Mentored juniors on testing skills\n"
+        "Research Engineer, Academic Medical Center\nCore Skills:\nPython"
+    )
+
+    spans = segment_resume(text)['spans']
+
+    assert section_text(text, spans['experience']).endswith("Academic Medical Center")
+    assert spans['education'] == []
+    assert section_text(text, spans['skills']) == "Core Skills:\nPython"
@@ -0,0 +1,56 @@
+"""
+Tests for the pgvector store that do not need a Postgres server
+"""
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+from src import pgvector_store
+from src.pgvector_store import PgVectorStore, _get_connection, _vector_literal
+
+
+def test_where_filters_become_parameterized_sql():
+    store = PgVectorStore.__new__(PgVectorStore)
+
+    sql, params = store._where_sql(store._normalize_where({"experience_years": {"$gte": 5}, "skill_python": True}))
+
+    assert "THEN (search_metadata->>%s)::float >= %s END" in sql
+    assert "search_metadata @> %s::jsonb" in sql
+    assert params == ["experience_years", "experience_years", 5, '{"skill_python": true}']
+
+
+def test_where_supports_or_and_membership():
+    store = PgVectorStore.__new__(PgVectorStore)
+
+    sql, params = store._where_sql({"$or": [{"job_id": {"$in": ["a", "b"]}}, {"source": {"$ne": "zip"}}]})
+
+    assert " OR " in sql
+    assert params == ["job_id", ['"a"', '"b"'], "source", '"zip"']
+
+
+def test_unsupported_operators_raise():
+    store = PgVectorStore.__new__(PgVectorStore)
+
+    with pytest.raises(ValueError):
+        store._where_sql({"score": {"$regex": "x"}})
+
+
+def test_stores_for_one_dsn_share_a_connection_and_its_lock(monkeypatch):
+    class FakeConnection:
+        closed = False
+
+    monkeypatch.setattr(pgvector_store.psycopg2, "connect", lambda dsn: FakeConnection())
+    monkeypatch.setattr(pgvector_store, "_connections", {})
+    monkeypatch.setattr(pgvector_store, "_connection_locks", {})
+
+    first = _get_connection("postgresql://test")
+    second = _get_connection("postgresql://test")
+
+    assert first[0] is second[0]
+    assert first[1] is second[1]
+
+
+def test_vector_literal():
+    assert _vector_literal([0.5, 1]) == "[0.5,1.0]"
@@ -0,0 +1,28 @@
+"""
+Tests for calibrating cross-encoder scores beyond the reranked shortlist
+"""
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from src.reranker import fit_rerank_calibration
+
+
+def test_scores_are_extrapolated_from_the_shortlist():
+    estimate = fit_rerank_calibration([0.9, 0.8, 0.7], [0.9, 0.7, 0.5])
+
+    assert estimate(0.6) == pytest.approx(0.3)
+    assert estimate(0.1) == 0.0
+
+
+def test_estimates_never_beat_a_reranked_resume():
+    estimate = fit_rerank_calibration([0.9, 0.8], [0.2, 0.6])
+
+    assert estimate(0.5) == 0.2
+
+
+def test_a_single_reranked_resume_sets_a_constant():
+    estimate = fit_rerank_calibration([0.8], [0.4])
+
+    assert estimate(0.3) == 0.4
+    assert fit_rerank_calibration([], [])(0.5) == 0.0
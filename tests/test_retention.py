@@ -0,0 +1,80 @@
+"""
+Tests for the retention job
+"""
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from src.retention import RetentionPolicy
+from src.sqlite_database import SQLiteDatabase
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "screening.db"))
+    job_id = database.save_job_description("Eng", "desc")
+    resume_id = database.save_resume("a.pdf", "text")
+    for created_at in ("2023-01-01T00:00:00.000", "2023-03-01T00:00:00.000", "2024-05-01T00:00:00.000"):
+        database.save_screening_result(job_id, resume_id, 50, "openai", {"recommendation": "MAYBE"},
+                                       created_at=created_at)
+    return database
+
+
+def test_old_rows_are_archived_then_removed(tmp_path, db):
+    policy = RetentionPolicy(db, retention_days=365, archive_dir=str(tmp_path / "archive"))
+
+    report = policy.run(now=NOW)
+
+    assert report['archived'] == 2
+    assert report['purged'] == 2
+    with gzip.open(report['archive_path'], 'rt', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert [row['created_at'] for row in rows] == ["2023-01-01T00:00:00.000", "2023-03-01T00:00:00.000"]
+    assert len(db.get_screening_history()) == 1
+
+
+def test_nothing_to_archive(tmp_path, db):
+    policy = RetentionPolicy(db, retention_days=3650, archive_dir=str(tmp_path / "archive"))
+
+    report = policy.run(now=NOW)
+
+    assert report['archived'] == 0
+    assert report['archive_path'] is None
+    assert len(db.get_screening_history()) == 3
+
+
+def test_nothing_is_removed_when_archiving_fails(tmp_path, db):
+    def failing_iter(before, batch_size):
+        yield {"id": "partial"}
+        raise ConnectionError("lost connection")
+
+    db.iter_screening_results_before = failing_iter
+    policy = RetentionPolicy(db, retention_days=365, archive_dir=str(tmp_path / "archive"))
+
+    with pytest.raises(ConnectionError):
+        policy.run(now=NOW)
+
+    assert len(db.get_screening_history()) == 3
+    assert list((tmp_path / "archive").iterdir()) == []
+
+
+def test_invalid_retention_days():
+    with pytest.raises(ValueError):
+        RetentionPolicy(None, retention_days=0)
+
+
+def test_archive_errors_are_not_hidden_by_cleanup(tmp_path, db, monkeypatch):
+    def failing_open(*args, **kwargs):
+        raise PermissionError("read-only archive directory")
+
+    monkeypatch.setattr("src.retention.gzip.open", failing_open)
+    policy = RetentionPolicy(db, retention_days=365, archive_dir=str(tmp_path / "archive"))
+
+    with pytest.raises(PermissionError):
+        policy.run(now=NOW)
+
+    assert len(db.get_screening_history()) == 3
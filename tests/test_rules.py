@@ -0,0 +1,112 @@
+"""
+Tests for the hard-requirement prefilter
+"""
+import pytest
+
+from src.rules import HardRequirements, detect_degree_level, extract_resume_features, DEGREE_LEVELS
+
+
+def features(skills=(), years=0.0, degree=0):
+    return {'skills': list(skills), 'experience_years': years, 'degree_level': degree}
+
+
+def test_detect_degree_level_picks_the_highest():
+    assert detect_degree_level("B.Sc. Physics, then a PhD in Chemistry") == DEGREE_LEVELS['phd']
+    assert detect_degree_level("MBA, 2015") == DEGREE_LEVELS['master']
+    assert detect_degree_level("High school diploma") == 0
+
+
+def test_evaluate_checks_every_requirement():
+    requirements = HardRequirements(min_years=3, mandatory_skills=['k8s', 'Python'], min_degree='bachelor')
+
+    outcomes = requirements.evaluate([
+        features(['Kubernetes', 'Python'], years=5, degree=1),
+        features(['Python'], years=1, degree=0),
+    ])
+
+    assert outcomes[0] == {'passed': True, 'action': None, 'reasons': []}
+    assert outcomes[1]['passed'] is False
+    assert outcomes[1]['action'] == 'reject'
+    assert len(outcomes[1]['reasons']) == 3
+    assert "Missing mandatory skills: Kubernetes" in outcomes[1]['reasons']
+
+
+def test_aliases_resolve_to_taxonomy_names():
+    assert HardRequirements(mandatory_skills=['k8s', 'kubernetes']).mandatory_skills == ['Kubernetes']
+
+
+def test_ambiguous_skills_are_checked_against_extracted_skills():
+    requirements = HardRequirements(mandatory_skills=['Go'])
+
+    outcomes = requirements.evaluate([features(['Go']), features()], ["Skills: Go", "Ready to go"])
+
+    assert requirements.text_skill_patterns == {}
+    assert [outcome['passed'] for outcome in outcomes] == [True, False]
+
+
+def test_flag_action_is_reported():
+    requirements = HardRequirements(min_years=10, action='flag')
+
+    assert requirements.evaluate([features(years=2)])[0]['action'] == 'flag'
+
+
+def test_empty_batch():
+    assert HardRequirements(min_years=1, mandatory_skills=['Python']).evaluate([]) == []
+
+
+def test_invalid_configuration_raises():
+    with pytest.raises(ValueError):
+        HardRequirements(min_degree='diploma')
+    with pytest.raises(ValueError):
+        HardRequirements(action='drop')
+
+
+def test_round_trip_through_dict():
+    requirements = HardRequirements(min_years=2, mandatory_skills=['Python'], min_degree='master', action='flag')
+
+    assert HardRequirements.from_dict(requirements.to_dict()).to_dict() == requirements.to_dict()
+
+
+def test_skills_outside_the_taxonomy_are_found_in_the_text():
+    requirements = HardRequirements(mandatory_skills=['SAP', 'Python'])
+
+    outcomes = requirements.evaluate(
+        [features(['Python']), features(['Python']), features(['Python'])],
+        ["Led an SAP rollout in Python", "Wrote Python for sapling research", "Python only"]
+    )
+
+    assert requirements.mandatory_skills == ['SAP', 'Python']
+    assert [outcome['passed'] for outcome in outcomes] == [True, False, False]
+    assert outcomes[1]['reasons'] == ["Missing mandatory skills: SAP"]
+
+
+def test_skills_outside_the_taxonomy_need_the_texts():
+    with pytest.raises(ValueError):
+        HardRequirements(mandatory_skills=['SAP']).evaluate([features()])
+
+
+def test_experience_is_read_from_the_experience_section():
+    resume = (
+        "Experience\nEngineer, Acme\nJan 2019 - Dec 2020\n"
+        "Education\nB.Sc. Computer Science\n2010 - 2014"
+    )
+
+    [with_sections, without_sections] = extract_resume_features([resume, "Engineer\n2016 - 2018"])
+
+    assert with_sections['experience_years'] == 2.0
+    assert with_sections['degree_level'] == DEGREE_LEVELS['bachelor']
+    assert without_sections['experience_years'] == 3.0
+
+
+def test_role_lines_mentioning_header_keywords_stay_in_the_experience_section():
+    resume = (
+        "Work Experience\n"
+        "Senior Engineer, Acme\nJan 2019 - Dec 2020\n- Mentored juniors on testing skills\n"
+        "Engineer, Beta\nJan 2015 - Dec 2018\n"
+        "Research Engineer, Academic Medical Center\nJan 2012 - Dec 2014\n"
+        "Education\nB.Sc. Physics\n2008 - 2011"
+    )
+
+    [resume_features] = extract_resume_features([resume])
+
+    assert resume_features['experience_years'] == 9.0
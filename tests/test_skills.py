@@ -0,0 +1,87 @@
+"""
+Tests for taxonomy skill matching
+"""
+from src.skills import SkillMatcher, load_skill_taxonomy, DEFAULT_SKILL_TAXONOMY
+
+
+def test_aliases_map_to_canonical_names():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert matcher.extract("Ran k8s clusters on Amazon Web Services with golang") == ["AWS", "Kubernetes", "Go"]
+
+
+def test_matches_respect_word_boundaries():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert "AI" not in matcher.extract("Helped maintain the build")
+    assert "Java" not in matcher.extract("JavaScript only")
+
+
+def test_multi_word_skills_match_across_line_breaks():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert "Machine Learning" in matcher.extract("Applied machine\nlearning to pricing")
+
+
+def test_alias_only_skills_need_an_alias():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert "Go" not in matcher.extract("Ready to go the extra mile")
+
+
+def test_symbol_skills_are_matched():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert matcher.extract("C++ and C# developer") == ["C++", "C#"]
+
+
+def test_load_csv_taxonomy(tmp_path):
+    path = tmp_path / "skills.csv"
+    path.write_text("Kubernetes,k8s\nSAP,sap erp\n", encoding="utf-8")
+
+    taxonomy = load_skill_taxonomy(str(path))
+
+    assert taxonomy == {"Kubernetes": ["k8s"], "SAP": ["sap erp"]}
+    assert SkillMatcher(taxonomy).extract("SAP ERP rollout") == ["SAP"]
+
+
+def test_everyday_words_are_not_skills():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert matcher.extract("Data encrypted at rest; I excel at mentoring; dosed 5 ml") == []
+
+
+def test_ambiguous_skills_match_in_context():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert matcher.extract("Built REST APIs, ML models and Microsoft Excel reports") == [
+        "Machine Learning", "Excel", "REST"
+    ]
+
+
+def test_ambiguous_names_match_as_list_items():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert matcher.extract("Skills: Go, Excel, REST, Python") == ["Python", "Go", "Excel", "REST"]
+    assert matcher.extract("Skills\n- Go\n• Excel\n") == ["Go", "Excel"]
+    assert matcher.extract("Let's go, team") == []
+
+
+def test_ambiguity_comes_from_the_taxonomy(tmp_path):
+    path = tmp_path / "skills.csv"
+    path.write_text("Go?,golang\nSAP\n", encoding="utf-8")
+
+    taxonomy = load_skill_taxonomy(str(path))
+    matcher = SkillMatcher(taxonomy)
+
+    assert taxonomy == {"Go": {"aliases": ["golang"], "ambiguous": True}, "SAP": []}
+    assert matcher.extract("Ready to go with SAP") == ["SAP"]
+    assert SkillMatcher({"Go": []}).extract("Ready to go") == ["Go"]
+
+
+def test_lookup_resolves_names_and_aliases():
+    matcher = SkillMatcher(DEFAULT_SKILL_TAXONOMY)
+
+    assert matcher.lookup("k8s") == "Kubernetes"
+    assert matcher.lookup("Go") == "Go"
+    assert matcher.lookup("SAP") is None
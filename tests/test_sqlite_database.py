@@ -0,0 +1,129 @@
+"""
+Tests for the SQLite backend: dedup, keyset history, search and retention paths
+"""
+import pytest
+
+from src.sqlite_database import SQLiteDatabase, websearch_to_fts5
+
+
+@pytest.fixture
+def db(tmp_path):
+    return SQLiteDatabase(str(tmp_path / "screening.db"))
+
+
+def save_result(db, job_id, resume_id, score, created_at, recommendation="HIRE"):
+    return db.save_screening_result(job_id, resume_id, score, "openai",
+                                    {"recommendation": recommendation, "ai_score": score},
+                                    created_at=created_at)
+
+
+def test_resumes_are_stored_once_per_text(db):
+    first = db.save_resume("a.pdf", "Python engineer")
+    second = db.save_resume("copy.pdf", "Python engineer")
+
+    assert first == second
+
+
+def test_job_description_save_is_idempotent(db):
+    assert db.save_job_description("Eng", "desc", job_id="job-1") == "job-1"
+    assert db.save_job_description("Eng", "desc", job_id="job-1") == "job-1"
+
+
+def test_history_pages_by_keyset_without_gaps(db):
+    job_id = db.save_job_description("Eng", "desc")
+    resume_id = db.save_resume("a.pdf", "text")
+    for day in range(1, 6):
+        save_result(db, job_id, resume_id, day, f"2024-01-0{day}T00:00:00.000")
+    # Same timestamp as another row: the id breaks the tie
+    save_result(db, job_id, resume_id, 9, "2024-01-03T00:00:00.000")
+
+    seen = []
+    page = db.get_screening_history(limit=4)
+    while page:
+        seen.extend(page)
+        last = page[-1]
+        page = db.get_screening_history(limit=4, before=(last['created_at'], last['id']))
+
+    assert len(seen) == 6
+    assert len({row['id'] for row in seen}) == 6
+    assert [row['created_at'] for row in seen] == sorted((row['created_at'] for row in seen), reverse=True)
+    assert seen[0]['job_descriptions']['title'] == "Eng"
+    assert len(db.get_screening_history(limit=10, since="2024-01-04")) == 2
+
+
+def test_screening_results_are_not_saved_twice(db):
+    job_id = db.save_job_description("Eng", "desc")
+    resume_id = db.save_resume("a.pdf", "text")
+    rows = [{"job_id": job_id, "resume_id": resume_id, "score": 70, "model_used": "openai",
+             "analysis": {"recommendation": "HIRE"}, "result_id": "r-1"}]
+
+    db.save_screening_results(rows)
+    db.save_screening_results(rows)
+
+    assert len(db.get_screening_history()) == 1
+    assert db.get_screening_detail("r-1")["analysis"] == {"recommendation": "HIRE"}
+
+
+def test_top_candidates_filter_by_recommendation(db):
+    job_id = db.save_job_description("Eng", "desc")
+    resume_id = db.save_resume("a.pdf", "text")
+    save_result(db, job_id, resume_id, 80, None)
+    save_result(db, job_id, resume_id, 90, None)
+    save_result(db, job_id, resume_id, 95, None, recommendation="REJECT")
+
+    candidates = db.get_top_candidates(job_id, "HIRE")
+
+    assert [row['score'] for row in candidates] == [90, 80]
+
+
+def test_search_ranks_matching_resumes(db):
+    if not db.search_enabled:
+        pytest.skip("SQLite FTS5 is not available")
+    db.save_resume("kube.pdf", "Kubernetes operator and Kubernetes administrator")
+    db.save_resume("py.pdf", "Python developer, some Kubernetes")
+    db.save_resume("acct.pdf", "Accountant")
+
+    results = db.search_resumes("kubernetes")
+
+    assert [row['filename'] for row in results] == ["kube.pdf", "py.pdf"]
+    assert "[Kubernetes]" in results[0]['snippet']
+
+
+def test_retention_reads_and_deletes_old_rows(db):
+    job_id = db.save_job_description("Eng", "desc")
+    resume_id = db.save_resume("a.pdf", "text")
+    for month in range(1, 6):
+        save_result(db, job_id, resume_id, month, f"2024-0{month}-01T00:00:00.000")
+
+    old = list(db.iter_screening_results_before("2024-04-01", batch_size=2))
+
+    assert [row['score'] for row in old] == [1, 2, 3]
+    assert old[0]['analysis'] == {"recommendation": "HIRE", "ai_score": 1}
+    assert db.purge_screening_results("2024-04-01") == 3
+    assert len(db.get_screening_history()) == 2
+
+
+def test_websearch_syntax_is_translated_to_fts5():
+    assert websearch_to_fts5('kubernetes "machine learning" -intern') == (
+        '("kubernetes" AND "machine learning") NOT ("intern")'
+    )
+    assert websearch_to_fts5("python or java sql") == '("python" OR "java") AND "sql"'
+    assert websearch_to_fts5('NEAR(a b) "unterminated') == '"NEAR a" AND "b" AND "unterminated"'
+    assert websearch_to_fts5("-intern") == ""
+    assert websearch_to_fts5("or") == ""
+
+
+def test_search_supports_phrases_exclusions_and_or(db):
+    if not db.search_enabled:
+        pytest.skip("SQLite FTS5 is not available")
+    db.save_resume("ml.pdf", "Kubernetes platform for machine learning")
+    db.save_resume("split.pdf", "Kubernetes, some machine work, learning Rust")
+    db.save_resume("intern.pdf", "Kubernetes intern doing machine learning")
+    db.save_resume("java.pdf", "Java developer")
+
+    def filenames(query):
+        return sorted(row['filename'] for row in db.search_resumes(query))
+
+    assert filenames('kubernetes "machine learning" -intern') == ["ml.pdf"]
+    assert filenames("rust or java") == ["java.pdf", "split.pdf"]
+    assert filenames("-intern") == []
@@ -0,0 +1,45 @@
+"""
+Tests for stored analysis trimming and result exports
+"""
+import json
+
+from src.utils import coerce_score, export_to_json, trim_analysis
+
+
+def test_coerce_score_reads_llm_score_formats():
+    assert coerce_score(85) == 85.0
+    assert coerce_score("85") == 85.0
+    assert coerce_score("72.5%") == 72.5
+    assert coerce_score("85/100") == 85.0
+    assert coerce_score("N/A") is None
+    assert coerce_score("") is None
+    assert coerce_score(True) is None
+
+
+def test_trim_analysis_stores_numeric_ai_scores_only():
+    assert trim_analysis({'ai_score': "85/100", 'recommendation': 'HIRE', 'metadata': {}}) == {
+        'ai_score': 85.0, 'recommendation': 'HIRE'
+    }
+    assert trim_analysis({'ai_score': "N/A", 'score': 40}) == {'score': 40}
+
+
+def test_export_to_json_writes_flattened_rows(tmp_path):
+    results = [
+        {'rank': 1, 'score': 80.0, 'matched_skills': ['Python', 'SQL'],
+         'metadata': {'name': 'Ada', 'sections': {'skills': [[0, 10]]}}},
+        {'rank': 2, 'score': 60.0, 'metadata': {}},
+    ]
+
+    filename = export_to_json(results, str(tmp_path / "results.json"), include_text=False)
+
+    with open(filename, encoding='utf-8') as f:
+        rows = json.load(f)
+    assert [row['rank'] for row in rows] == [1, 2]
+    assert rows[0]['name'] == 'Ada'
+    assert rows[0]['matched_skills'] == 'Python; SQL'
+    assert 'metadata' not in rows[0] and 'reasoning' not in rows[0]
+
+
+def test_export_to_json_writes_an_empty_array(tmp_path):
+    with open(export_to_json([], str(tmp_path / "results.json")), encoding='utf-8') as f:
+        assert json.load(f) == []
@@ -0,0 +1,84 @@
+"""
+Tests for the Chroma vector store that do not need a Chroma server
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+
+from src import vector_store
+from src.vector_store import VectorStore
+
+
+class FakeCollection:
+    """Answers dense queries with every stored id, in insertion order"""
+
+    def __init__(self):
+        self.ids = []
+        self.metadatas = {}
+
+    def count(self):
+        return len(self.ids)
+
+    def query(self, query_embeddings, n_results, where=None, include=()):
+        ids = self.ids[:n_results]
+        return {"ids": [ids], "distances": [[0.5] * len(ids)]}
+
+    def get(self, ids=None, include=(), where=None):
+        found = [doc_id for doc_id in self.ids if ids is None or doc_id in ids]
+        return {"ids": found, "metadatas": [self.metadatas[doc_id] for doc_id in found]}
+
+    def add(self, embeddings, documents, ids, metadatas):
+        self.ids.extend(ids)
+        self.metadatas.update(zip(ids, metadatas))
+
+    def update(self, ids, metadatas):
+        self.metadatas.update(zip(ids, metadatas))
+
+
+class FakeClient:
+    def get_or_create_collection(self, name, metadata=None):
+        return FakeCollection()
+
+
+class FakeModel:
+    def encode(self, text):
+        return np.ones(3)
+
+
+@pytest.fixture(autouse=True)
+def fakes(monkeypatch):
+    monkeypatch.setattr(vector_store, "_get_client", lambda mode, *args: (FakeClient(), (mode,) + args))
+    monkeypatch.setattr(vector_store, "_get_embedding_model", lambda: FakeModel())
+    monkeypatch.setattr(vector_store, "_lexical_indexes", {})
+
+
+def test_http_mode_keeps_no_lexical_index():
+    store = VectorStore(client_mode="http")
+    store.add_resume("Kubernetes operator", {})
+
+    results = store.search_similar_resumes("kubernetes", include=["distances"])
+
+    assert store.lexical_index is None
+    assert [result["id"] for result in results] == [store._generate_id("Kubernetes operator")]
+    assert "bm25_score" not in results[0]
+
+
+def test_persistent_mode_logs_the_lexical_index(tmp_path):
+    store = VectorStore(persist_directory=str(tmp_path), client_mode="persistent")
+    store.add_resume("Kubernetes operator", {})
+
+    assert len(store.lexical_index) == 1
+    assert (tmp_path / "bm25_index.jsonl").exists()
+
+
+def test_known_resumes_accumulate_jobs_and_keep_their_first_upload_time(tmp_path):
+    store = VectorStore(persist_directory=str(tmp_path), client_mode="persistent")
+    resume_id = store.add_resume("Kubernetes operator", {"job_a": True, "uploaded_at": 1.0, "experience_years": 2})
+
+    store.add_resume("Kubernetes operator", {"job_b": True, "uploaded_at": 2.0, "experience_years": 3})
+
+    assert store.resume_collection.metadatas[resume_id] == {
+        "job_a": True, "job_b": True, "uploaded_at": 1.0, "experience_years": 3
+    }
@@ -1,10 +1,21 @@
 """
 Utility functions for resume screening
 """
+import io
 import re
+import csv
 import json
-from typing import List, Dict, Any
-from datetime import datetime
+import hashlib
+import uuid
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from datetime import datetime, timezone
+
+try:
+    from .skills import get_skill_matcher
+    from .experience import extract_experience
+except ImportError:
+    from src.skills import get_skill_matcher
+    from src.experience import extract_experience
 
 
 def clean_text(text: str) -> str:
@@ -18,40 +29,53 @@ def clean_text(text: str) -> str:
     return text.strip()
 
 
+def content_hash(text: str) -> str:
+    """SHA-256 of resume text, the key used to store each unique resume once"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+# Namespace of the job description ids derived from their text
+JOB_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "job_descriptions")
+
+
+def job_description_id(description: str) -> str:
+    """Stable UUID for a job description, derived from its cleaned text
+    
+    Screening the same job description again reuses its job row, so
+    per-job and per-model statistics group runs of the same job.
+    """
+    return str(uuid.uuid5(JOB_ID_NAMESPACE, content_hash(clean_text(description))))
+
+
+def utc_timestamp(moment: datetime = None) -> str:
+    """UTC time in the format stored in created_at columns, e.g. 2024-05-01T12:30:00.123"""
+    moment = (moment or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+
+
 def extract_skills(text: str) -> List[str]:
-    """Extract skills from text"""
-    common_skills = [
-        'Python', 'Java', 'JavaScript', 'React', 'Node.js', 'SQL', 'MongoDB',
-        'AWS', 'Docker', 'Kubernetes', 'Git', 'Machine Learning', 'AI',
-        'TensorFlow', 'PyTorch', 'Data Science', 'Analytics', 'Agile', 'Scrum'
-    ]
-    found_skills = []
-    text_lower = text.lower()
-    for skill in common_skills:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    return found_skills
-
-
-def calculate_experience_years(text: str) -> float:
-    """Calculate years of experience from resume text"""
-    # Look for patterns like "5 years", "3+ years", etc.
-    patterns = [
-        r'(\d+)\+?\s*years?',
-        r'(\d+)\+?\s*yrs?',
-    ]
-    years = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text.lower())
-        for match in matches:
-            try:
-                years.append(float(match))
-            except:
-                pass
-    
-    if years:
-        return max(years)
-    return 0.0
+    """Extract skills from text
+    
+    Skills and their aliases (e.g. "k8s" for Kubernetes) are matched as whole
+    words in a single pass; see skills.get_skill_matcher for the taxonomy.
+    """
+    return get_skill_matcher().extract(text)
+
+
+def extract_skills_batch(texts: List[str]) -> List[List[str]]:
+    """Extract skills from many texts"""
+    return get_skill_matcher().extract_batch(texts)
+
+
+def calculate_experience_years(text: str, spans: Optional[List[List[int]]] = None) -> float:
+    """Calculate years of experience from resume text
+    
+    Employment date ranges ("Jan 2019 - Present", "2015-2018") are merged so
+    overlapping roles count once; without dates, an explicitly stated
+    "N years of experience" is used. spans restricts the date ranges to the
+    experience section (see parsers.segment_resume).
+    """
+    return extract_experience(text, spans=spans)['total_years']
 
 
 def format_score(score: float) -> str:
@@ -70,13 +94,206 @@ def create_summary(data: Dict[str, Any]) -> str:
     return summary.strip()
 
 
-def export_to_json(data: List[Dict], filename: str = None):
-    """Export data to JSON"""
+def export_to_json(data: Iterable[Dict], filename: str = None, include_text: bool = True):
+    """Export results to a JSON array of flattened rows, writing one row at a time
+    
+    Rows follow the same schema as export_to_jsonl; prefer JSON Lines for
+    large exports.
+    """
     if filename is None:
         filename = f"resume_screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write('[')
+        for index, line in enumerate(iter_jsonl(data, include_text)):
+            f.write((',\n' if index else '\n') + line.rstrip('\n'))
+        f.write('\n]\n')
+    
+    return filename
+
+
+
+# Fields of a screening result kept in the stored analysis. Metadata (with
+# section offsets), skills and experience are left out: they are either
+# stored in their own columns or only needed while screening
+ANALYSIS_FIELDS = (
+    'score', 'ai_score', 'vector_similarity', 'rerank_score', 'recommendation',
+    'strengths', 'weaknesses', 'matched_requirements', 'missing_requirements',
+    'reasoning', 'skill_confidence', 'prefilter'
+)
+
+
+# Leading number of an LLM score such as 85, "85", "85%" or "85/100"
+SCORE_PATTERN = re.compile(r'^\s*(-?\d+(?:\.\d+)?)')
+
+
+def coerce_score(value: Any) -> Optional[float]:
+    """Read a score returned by an LLM as a float, or None when it is not numeric (e.g. "N/A")"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = SCORE_PATTERN.match(str(value))
+    return float(match.group(1)) if match else None
+
+
+def trim_analysis(result: Dict) -> Dict:
+    """Reduce a screening result to the analysis stored in the database
+
+    ai_score is stored as a number or not at all, since the database casts
+    it to a float in an index.
+    """
+    analysis = {field: result[field] for field in ANALYSIS_FIELDS if result.get(field) is not None}
+    if 'ai_score' in analysis:
+        ai_score = coerce_score(analysis.pop('ai_score'))
+        if ai_score is not None:
+            analysis['ai_score'] = ai_score
+    return analysis
+
+
+# Flat export schema: column name -> Arrow type name. List fields are joined
+# with "; " and metadata fields are lifted to top-level columns
+EXPORT_COLUMNS = {
+    'rank': 'int64',
+    'filename': 'string',
+    'name': 'string',
+    'email': 'string',
+    'phone': 'string',
+    'score': 'float64',
+    'ai_score': 'float64',
+    'vector_similarity': 'float64',
+    'rerank_score': 'float64',
+    'recommendation': 'string',
+    'experience_years': 'float64',
+    'matched_skills': 'string',
+    'prefilter_passed': 'bool',
+    'prefilter_reasons': 'string',
+    'model_used': 'string',
+    'resume_id': 'string',
+    'truncated': 'bool',
+    'strengths': 'string',
+    'weaknesses': 'string',
+    'matched_requirements': 'string',
+    'missing_requirements': 'string',
+    'reasoning': 'string',
+}
+
+# Free-text columns that can be left out of exports meant for analytics
+LARGE_TEXT_COLUMNS = ('strengths', 'weaknesses', 'matched_requirements', 'missing_requirements', 'reasoning')
+
+
+def export_columns(include_text: bool = True) -> List[str]:
+    """Return the export column names, optionally without the large text fields"""
+    return [column for column in EXPORT_COLUMNS if include_text or column not in LARGE_TEXT_COLUMNS]
+
+
+def flatten_result(result: Dict, include_text: bool = True) -> Dict:
+    """Flatten a screening result into the export schema
+    
+    Nested fields such as metadata.sections are not exported; only the
+    columns in EXPORT_COLUMNS are kept.
+    """
+    metadata = result.get('metadata') or {}
+    prefilter = result.get('prefilter') or {}
+    row = {
+        'rank': result.get('rank'),
+        'filename': result.get('filename', metadata.get('filename')),
+        'name': metadata.get('name'),
+        'email': metadata.get('email'),
+        'phone': metadata.get('phone'),
+        'score': result.get('score'),
+        'ai_score': result.get('ai_score'),
+        'vector_similarity': result.get('vector_similarity'),
+        'rerank_score': result.get('rerank_score'),
+        'recommendation': result.get('recommendation'),
+        'experience_years': result.get('experience_years'),
+        'matched_skills': '; '.join(result.get('matched_skills') or []),
+        'prefilter_passed': prefilter.get('passed'),
+        'prefilter_reasons': '; '.join(prefilter.get('reasons') or []),
+        'model_used': result.get('model_used'),
+        'resume_id': result.get('resume_id'),
+        'truncated': metadata.get('truncated'),
+    }
+    if include_text:
+        for column in ('strengths', 'weaknesses', 'matched_requirements', 'missing_requirements'):
+            row[column] = '; '.join(result.get(column) or [])
+        row['reasoning'] = result.get('reasoning')
+    return row
+
+
+def iter_jsonl(results: Iterable[Dict], include_text: bool = True) -> Iterator[str]:
+    """Yield one flattened JSON Lines record per result"""
+    for result in results:
+        yield json.dumps(flatten_result(result, include_text), ensure_ascii=False) + '\n'
+
+
+def iter_csv(results: Iterable[Dict], include_text: bool = True) -> Iterator[str]:
+    """Yield flattened CSV text: the header, then one chunk per result"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=export_columns(include_text))
+    writer.writeheader()
+    for result in results:
+        writer.writerow(flatten_result(result, include_text))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_to_jsonl(data: Iterable[Dict], filename: str = None, include_text: bool = True):
+    """Export results to JSON Lines, writing one row at a time"""
+    if filename is None:
+        filename = f"resume_screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.writelines(iter_jsonl(data, include_text))
     
     return filename
 
+
+def export_to_csv(data: Iterable[Dict], filename: str = None, include_text: bool = True):
+    """Export results to CSV, writing one row at a time"""
+    if filename is None:
+        filename = f"resume_screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        f.writelines(iter_csv(data, include_text))
+    
+    return filename
+
+
+def export_to_parquet(data: Iterable[Dict], filename=None, include_text: bool = False,
+                      batch_size: int = 1000):
+    """Export results to Parquet in row groups of batch_size
+    
+    filename may be a path or a binary file object. Large text fields are
+    excluded by default, since Parquet exports are meant for analytics.
+    Requires pyarrow.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow. Install it with: pip install pyarrow")
+    
+    if filename is None:
+        filename = f"resume_screening_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+    
+    columns = export_columns(include_text)
+    schema = pa.schema([(column, pa.type_for_alias(EXPORT_COLUMNS[column])) for column in columns])
+    
+    def write_batch(writer, rows):
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    
+    with pq.ParquetWriter(filename, schema) as writer:
+        rows = []
+        for result in data:
+            rows.append(flatten_result(result, include_text))
+            if len(rows) >= batch_size:
+                write_batch(writer, rows)
+                rows = []
+        if rows:
+            write_batch(writer, rows)
+    
+    return filename
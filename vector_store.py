@@ -4,27 +4,90 @@ Vector database operations using ChromaDB
 import chromadb
 from chromadb.config import Settings
 import os
+import threading
 from typing import List, Dict, Optional
 from sentence_transformers import SentenceTransformer
 import hashlib
 
+try:
+    from .lexical_index import BM25Index, reciprocal_rank_fusion
+except ImportError:
+    from src.lexical_index import BM25Index, reciprocal_rank_fusion
+
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+# Resume metadata that keeps its first value when a known resume is added again
+FIRST_SEEN_METADATA = ("uploaded_at",)
+VECTOR_BACKENDS = ("chroma", "pgvector")
+
+# Clients, embedding models and lexical indexes are shared by every
+# VectorStore in the process, so repeated construction (e.g. on each
+# Streamlit run) reuses open connections and loaded models
+_clients = {}
+_embedding_models = {}
+_lexical_indexes = {}
+_shared_lock = threading.Lock()
+
+
+def _get_client(client_mode: str, persist_directory: str, host: str, port: int):
+    """Get a shared ChromaDB client for the given location"""
+    key = (client_mode, persist_directory) if client_mode == "persistent" else (client_mode, host, port)
+    with _shared_lock:
+        if key not in _clients:
+            if client_mode == "http":
+                _clients[key] = chromadb.HttpClient(
+                    host=host,
+                    port=port,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+            elif client_mode == "persistent":
+                os.makedirs(persist_directory, exist_ok=True)
+                _clients[key] = chromadb.PersistentClient(
+                    path=persist_directory,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+            else:
+                raise ValueError(f"Unsupported Chroma client mode: {client_mode}. Supported: persistent, http")
+        return _clients[key], key
+
+
+def _get_embedding_model(model_name: str = EMBEDDING_MODEL_NAME) -> SentenceTransformer:
+    """Load a sentence transformer once per process"""
+    with _shared_lock:
+        if model_name not in _embedding_models:
+            _embedding_models[model_name] = SentenceTransformer(model_name)
+        return _embedding_models[model_name]
+
 
 class VectorStore:
     """ChromaDB vector store for resumes and job descriptions"""
     
-    def __init__(self, persist_directory: str = "./chroma_db"):
-        """Initialize ChromaDB client"""
-        self.persist_directory = persist_directory
-        os.makedirs(persist_directory, exist_ok=True)
+    def __init__(self, persist_directory: Optional[str] = None, client_mode: Optional[str] = None,
+                 host: Optional[str] = None, port: Optional[int] = None):
+        """Initialize ChromaDB client
+        
+        client_mode "persistent" (default) stores the index in
+        persist_directory; "http" talks to a shared Chroma server at
+        host:port (e.g. started with `chroma run --path ./chroma_db`), so
+        several app workers use one index. The BM25 index is local to a
+        process, so in http mode there is none and searches are dense only;
+        use the pgvector backend for hybrid search shared between workers,
+        since its keyword ranking runs in Postgres. Defaults come from the
+        CHROMA_CLIENT_MODE, CHROMA_PERSIST_DIRECTORY, CHROMA_HOST and
+        CHROMA_PORT environment variables.
+        """
+        self.client_mode = (client_mode or os.getenv("CHROMA_CLIENT_MODE", "persistent")).lower()
+        self.persist_directory = persist_directory or os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
+        self.host = host or os.getenv("CHROMA_HOST", "localhost")
+        self.port = int(port or os.getenv("CHROMA_PORT", "8000"))
         
         # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(anonymized_telemetry=False)
+        self.client, client_key = _get_client(
+            self.client_mode, self.persist_directory, self.host, self.port
         )
         
         # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model = _get_embedding_model()
         
         # Get or create collections
         self.resume_collection = self.client.get_or_create_collection(
@@ -36,6 +99,36 @@ class VectorStore:
             name="job_descriptions",
             metadata={"hnsw:space": "cosine"}
         )
+        
+        # Lexical index kept in sync with the resume collection, logged next
+        # to the persistent index. A shared server has no such place: every
+        # worker would download the whole corpus and hold its own copy in
+        # memory, so there is no lexical index in http mode
+        self.lexical_index: Optional[BM25Index] = None
+        if self.client_mode == "persistent":
+            with _shared_lock:
+                if client_key not in _lexical_indexes:
+                    _lexical_indexes[client_key] = BM25Index(
+                        log_path=os.path.join(self.persist_directory, "bm25_index.jsonl")
+                    )
+                self.lexical_index = _lexical_indexes[client_key]
+            self._sync_lexical_index()
+        
+        # Job description embeddings already stored or computed, by job id
+        self._job_embeddings: Dict[str, List[float]] = {}
+    
+    def _sync_lexical_index(self):
+        """Backfill the lexical index with resumes it has not seen yet"""
+        if self.resume_collection.count() == len(self.lexical_index):
+            return
+        
+        stored_ids = self.resume_collection.get(include=[])['ids']
+        missing_ids = [doc_id for doc_id in stored_ids if doc_id not in self.lexical_index]
+        if not missing_ids:
+            return
+        
+        stored = self.resume_collection.get(ids=missing_ids, include=["documents"])
+        self.lexical_index.add_many(zip(stored['ids'], stored['documents']))
     
     def _generate_id(self, text: str) -> str:
         """Generate unique ID from text"""
@@ -46,18 +139,8 @@ class VectorStore:
         embedding = self.embedding_model.encode(text).tolist()
         return embedding
     
-    def add_resume(self, resume_text: str, metadata: Dict) -> str:
-        """Add resume to vector store"""
-        resume_id = self._generate_id(resume_text)
-        
-        # Check if already exists
-        existing = self.resume_collection.get(ids=[resume_id])
-        if existing['ids']:
-            return resume_id
-        
-        embedding = self._embed_text(resume_text)
-        
-        # Clean metadata - only keep simple types
+    def _clean_metadata(self, metadata: Dict) -> Dict:
+        """Clean metadata - only keep simple types"""
         clean_metadata = {}
         for key, value in metadata.items():
             if isinstance(value, (str, int, float, bool, type(None))):
@@ -68,6 +151,29 @@ class VectorStore:
                     clean_metadata[f"{key}_keys"] = str(list(value.keys())[:5])  # Store first 5 keys
                 elif isinstance(value, list):
                     clean_metadata[f"{key}_count"] = len(value)
+        return clean_metadata
+    
+    def add_resume(self, resume_text: str, metadata: Dict) -> str:
+        """Add resume to vector store"""
+        resume_id = self._generate_id(resume_text)
+        
+        clean_metadata = self._clean_metadata(metadata)
+        
+        # Check if already exists; merge its metadata without re-embedding
+        # the text. Flags such as job_<id> accumulate and the first
+        # uploaded_at is kept
+        existing = self.resume_collection.get(ids=[resume_id], include=["metadatas"])
+        if existing['ids']:
+            if clean_metadata:
+                stored_metadata = existing['metadatas'][0] or {}
+                merged = dict(stored_metadata, **clean_metadata)
+                for key in FIRST_SEEN_METADATA:
+                    if key in stored_metadata:
+                        merged[key] = stored_metadata[key]
+                self.resume_collection.update(ids=[resume_id], metadatas=[merged])
+            return resume_id
+        
+        embedding = self._embed_text(resume_text)
         
         self.resume_collection.add(
             embeddings=[embedding],
@@ -75,61 +181,164 @@ class VectorStore:
             ids=[resume_id],
             metadatas=[clean_metadata]
         )
+        if self.lexical_index is not None:
+            self.lexical_index.add(resume_id, resume_text)
         
         return resume_id
     
     def add_job_description(self, job_text: str, metadata: Dict) -> str:
-        """Add job description to vector store"""
+        """Add job description to vector store
+        
+        Job descriptions are keyed by a hash of their text, so a known job
+        description is not embedded again; its stored embedding is reused.
+        """
         job_id = self._generate_id(job_text)
         
+        if self.get_job_embedding(job_id) is not None:
+            return job_id
+        
         embedding = self._embed_text(job_text)
         
-        # Clean metadata - only keep simple types
-        clean_metadata = {}
-        for key, value in metadata.items():
-            if isinstance(value, (str, int, float, bool, type(None))):
-                clean_metadata[key] = value
-            else:
-                # Skip complex types or convert to string representation
-                if isinstance(value, dict):
-                    clean_metadata[f"{key}_keys"] = str(list(value.keys())[:5])  # Store first 5 keys
-                elif isinstance(value, list):
-                    clean_metadata[f"{key}_count"] = len(value)
+        clean_metadata = self._clean_metadata(metadata)
         
-        self.job_collection.add(
+        self.job_collection.upsert(
             embeddings=[embedding],
             documents=[job_text],
             ids=[job_id],
             metadatas=[clean_metadata]
         )
+        self._job_embeddings[job_id] = embedding
         
         return job_id
     
-    def search_similar_resumes(self, job_description: str, top_k: int = 10) -> List[Dict]:
-        """Search for similar resumes based on job description"""
+    def get_job_embedding(self, job_id: str) -> Optional[List[float]]:
+        """Get the stored embedding for a job description, or None if unknown"""
+        if job_id not in self._job_embeddings:
+            existing = self.job_collection.get(ids=[job_id], include=["embeddings"])
+            if not existing['ids']:
+                return None
+            self._job_embeddings[job_id] = list(existing['embeddings'][0])
+        
+        return self._job_embeddings[job_id]
+    
+    def _normalize_where(self, where: Optional[Dict]) -> Optional[Dict]:
+        """Combine several plain metadata conditions with $and as Chroma requires"""
+        if not where or len(where) == 1 or any(key.startswith("$") for key in where):
+            return where or None
+        return {"$and": [{key: value} for key, value in where.items()]}
+    
+    def search_similar_resumes(self, job_description: str, top_k: int = 10,
+                               hybrid: bool = True, dense_weight: float = 1.0,
+                               lexical_weight: float = 1.0, rrf_k: int = 60,
+                               where: Optional[Dict] = None,
+                               include: Optional[List[str]] = None,
+                               offset: int = 0) -> List[Dict]:
+        """Search for similar resumes based on job description
+        
+        With hybrid=True the dense (embedding) ranking is fused with a BM25
+        keyword ranking using weighted reciprocal rank fusion, so hard keyword
+        requirements are not lost to semantic similarity. In http mode there
+        is no BM25 index and hybrid is ignored.
+        
+        `where` is a Chroma metadata filter applied before ranking, e.g.
+        {"experience_years": {"$gte": 5}, "skill_kubernetes": True}. `include`
+        selects which of "documents", "metadatas" and "distances" are returned
+        (ids are always returned), and offset/top_k page through the ranking.
+        """
+        if include is None:
+            include = ["documents", "metadatas", "distances"]
+        where = self._normalize_where(where)
         query_embedding = self._embed_text(job_description)
         
+        # Fetch a deeper candidate list from each ranker before fusing
+        page_end = offset + top_k
+        hybrid = hybrid and self.lexical_index is not None
+        candidate_k = page_end * 3 if hybrid else page_end
         results = self.resume_collection.query(
             query_embeddings=[query_embedding],
-            n_results=top_k
+            n_results=candidate_k,
+            where=where,
+            include=include
         )
         
         # Format results
-        formatted_results = []
+        dense_results = {}
+        dense_ranking = []
         if results['ids'] and len(results['ids'][0]) > 0:
+            # Query results hold one list per query embedding
+            columns = {name: results[name][0] for name in include if results.get(name)}
             for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    'id': results['ids'][0][i],
-                    'document': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i] if 'distances' in results else None
-                })
+                doc_id = results['ids'][0][i]
+                dense_ranking.append(doc_id)
+                dense_results[doc_id] = self._format_result(doc_id, columns, i, include)
+        
+        if not hybrid:
+            return [dense_results[doc_id] for doc_id in dense_ranking[offset:page_end]]
+        
+        lexical_hits = self.lexical_index.search(job_description, top_k=candidate_k)
+        if where and lexical_hits:
+            # Apply the same metadata filter to keyword-only candidates
+            allowed = set(self.resume_collection.get(
+                ids=[doc_id for doc_id, _ in lexical_hits], where=where, include=[]
+            )['ids'])
+            lexical_hits = [(doc_id, score) for doc_id, score in lexical_hits if doc_id in allowed]
+        
+        lexical_scores = dict(lexical_hits)
+        fused = reciprocal_rank_fusion(
+            [dense_ranking, [doc_id for doc_id, _ in lexical_hits]],
+            weights=[dense_weight, lexical_weight],
+            k=rrf_k
+        )[offset:page_end]
+        
+        # Load requested fields for keyword-only hits that the dense query did not return
+        missing_ids = [doc_id for doc_id, _ in fused if doc_id not in dense_results]
+        if missing_ids:
+            get_include = [field for field in include if field != "distances"]
+            if get_include:
+                missing = self.resume_collection.get(ids=missing_ids, include=get_include)
+                for i, doc_id in enumerate(missing['ids']):
+                    dense_results[doc_id] = self._format_result(doc_id, missing, i, include)
+            else:
+                for doc_id in missing_ids:
+                    dense_results[doc_id] = self._format_result(doc_id, {}, None, include)
+        
+        formatted_results = []
+        for doc_id, fused_score in fused:
+            if doc_id not in dense_results:
+                continue
+            result = dense_results[doc_id]
+            result['bm25_score'] = lexical_scores.get(doc_id)
+            result['fused_score'] = fused_score
+            formatted_results.append(result)
         
         return formatted_results
     
-    def calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate cosine similarity between two texts"""
-        embedding1 = self._embed_text(text1)
+    def _format_result(self, doc_id: str, columns: Dict, index: Optional[int],
+                       include: List[str]) -> Dict:
+        """Build a search result containing only the requested fields"""
+        def field(name):
+            values = columns.get(name)
+            if values is None or index is None:
+                return None
+            return values[index]
+        
+        result = {'id': doc_id}
+        if "documents" in include:
+            result['document'] = field('documents')
+        if "metadatas" in include:
+            result['metadata'] = field('metadatas')
+        if "distances" in include:
+            result['distance'] = field('distances')
+        return result
+    
+    def calculate_similarity(self, text1: str, text2: str,
+                             embedding1: Optional[List[float]] = None) -> float:
+        """Calculate cosine similarity between two texts
+        
+        Pass embedding1 to reuse a precomputed embedding of text1.
+        """
+        if embedding1 is None:
+            embedding1 = self._embed_text(text1)
         embedding2 = self._embed_text(text2)
         
         # Calculate cosine similarity
@@ -141,6 +350,20 @@ class VectorStore:
         similarity = dot_product / (norm1 * norm2)
         return float(similarity)
     
+    def calculate_similarities(self, text: str, texts: List[str],
+                               embedding1: Optional[List[float]] = None) -> List[float]:
+        """Calculate cosine similarity between one text and many, embedding them in one batch"""
+        import numpy as np
+        if not texts:
+            return []
+        if embedding1 is None:
+            embedding1 = self._embed_text(text)
+        
+        query = np.asarray(embedding1, dtype=np.float32)
+        matrix = self.embedding_model.encode(texts, convert_to_numpy=True)
+        similarities = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        return [float(similarity) for similarity in similarities]
+    
     def clear_collections(self):
         """Clear all collections"""
         try:
@@ -159,4 +382,25 @@ class VectorStore:
             name="job_descriptions",
             metadata={"hnsw:space": "cosine"}
         )
+        if self.lexical_index is not None:
+            self.lexical_index.clear()
+        self._job_embeddings = {}
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """Create the vector store selected by backend or the VECTOR_BACKEND variable
+
+    "chroma" (default) keeps embeddings in a local or shared Chroma index;
+    "pgvector" keeps them on the Postgres resumes table.
+    """
+    backend = (backend or os.getenv("VECTOR_BACKEND", "chroma")).lower()
+    if backend == "chroma":
+        return VectorStore()
+    if backend == "pgvector":
+        try:
+            from .pgvector_store import PgVectorStore
+        except ImportError:
+            from src.pgvector_store import PgVectorStore
+        return PgVectorStore()
+    raise ValueError(f"Unsupported vector backend: {backend}. Supported: {', '.join(VECTOR_BACKENDS)}")
 